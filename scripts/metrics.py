@@ -4,19 +4,130 @@
 import json
 import sys
 import argparse
+from array import array
+from operator import attrgetter, itemgetter
 from pathlib import Path
+from typing import NamedTuple
+
+# orjson decodes log records considerably faster; fall back to stdlib json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# msgspec decodes state records straight into typed structs, so the metrics
+# loop reads fields as slots instead of hashing dict keys
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+if msgspec is not None:
+    class NodeRecord(msgspec.Struct):
+        uid: int
+        online: bool
+        leader: int
+        election: bool
+
+    class StateRecord(msgspec.Struct):
+        tick: int
+        nodes: list[NodeRecord]
+
+    _decode_state = msgspec.json.Decoder(StateRecord).decode
+    _node_fields = attrgetter("uid", "online", "leader", "election")
+
+    def _scan_nodes(nodes):
+        """Single pass over one tick's node records.
+
+        Returns (online_mask, leader, all_agree, election_mask), where the
+        masks have bit `uid` set for each online / electing node. `leader` is
+        the view of the first online node; when all online nodes agree it is
+        the agreed leader.
+        """
+        online_mask = 0
+        election_mask = 0
+        leader = None
+        all_agree = True
+
+        for n in nodes:
+            bit = 1 << n.uid
+            if n.election:
+                election_mask |= bit
+            if not n.online:
+                continue
+            if not online_mask:
+                leader = n.leader
+            elif n.leader != leader:
+                all_agree = False
+            online_mask |= bit
+
+        return online_mask, leader, all_agree, election_mask
+
+else:
+    class StateRecord(NamedTuple):
+        tick: int
+        nodes: list  # node dicts as found in the log
+
+    def _decode_state(line):
+        data = _json_loads(line)
+        return StateRecord(data["tick"], data["nodes"])
+
+    _node_fields = itemgetter("uid", "online", "leader", "election")
+
+    def _scan_nodes(nodes):
+        """Single pass over one tick's node dicts (see the msgspec variant)."""
+        online_mask = 0
+        election_mask = 0
+        leader = None
+        all_agree = True
+
+        for n in nodes:
+            bit = 1 << n["uid"]
+            if n["election"]:
+                election_mask |= bit
+            if not n["online"]:
+                continue
+            n_leader = n["leader"]
+            if not online_mask:
+                leader = n_leader
+            elif n_leader != leader:
+                all_agree = False
+            online_mask |= bit
+
+        return online_mask, leader, all_agree, election_mask
+
+
+def _has_bit(mask, uid):
+    """Whether bit `uid` is set in `mask`; negative uids (no leader) never are."""
+    return uid >= 0 and (mask >> uid) & 1 == 1
+
+
+def iter_states(path):
+    """Stream the state log, yielding ("meta", dict) or ("state", record) per line."""
+    with open(path, 'rb') as f:
+        for line in f:
+            # Only the metadata record carries this key
+            if b'"metadata"' in line:
+                yield "meta", _json_loads(line)
+            else:
+                yield "state", _decode_state(line)
+
+
+def iter_state_records(path, metadata):
+    """Yield the state records of a log, storing its metadata into `metadata`."""
+    for kind, record in iter_states(path):
+        if kind == "meta":
+            metadata.update(record)
+        else:
+            yield record
+
 
 def load_states_and_metadata(path):
     """Load state log and extract metadata."""
-    states = []
     metadata = {}
-    with open(path) as f:
-        for line in f:
-            data = json.loads(line)
-            if "metadata" in data:
-                metadata = data
-            else:
-                states.append(data)
+    states = list(iter_state_records(path, metadata))
     return states, metadata
 
 
@@ -29,8 +140,9 @@ def load_config(config_path):
         return None
 
 def compute_metrics(states):
+    """Compute metrics from any iterable of states; a generator is consumed once."""
     results = {
-        "total_ticks": len(states),
+        "total_ticks": 0,
         "elections_started": 0,
         "agreement_ticks": 0,
         "convergence_times": [],
@@ -39,33 +151,30 @@ def compute_metrics(states):
 
     prev_leader = None
     leader_lost_tick = None
-    prev_elections = set()
+    prev_elections = 0  # bitmask of nodes in an election at the previous active tick
     leader_was_offline = False  # Track if leader actually went offline
 
-    for state in states:
-        tick = state["tick"]
-        nodes = state["nodes"]
+    total_ticks = 0
+    elections_started = 0
+    # The stream length is unknown up front, so collect samples in a typed
+    # int64 buffer rather than a list of int objects
+    convergence_times = array('q')
 
-        online_nodes = [n for n in nodes if n["online"]]
+    for state in states:
+        total_ticks += 1
+        tick = state.tick
+        online_mask, leader, all_agree, current_elections = _scan_nodes(state.nodes)
 
-        if not online_nodes:
+        if not online_mask:
             continue
 
         # --- Metric 1: Convergence Time ---
         # Track when leader goes offline or nodes disagree about leader
-        leader_views = {n["leader"] for n in online_nodes}
-        all_agree = len(leader_views) == 1
-        agreed_leader = next(iter(leader_views)) if all_agree else None
-
-        # Check if current leader is online
-        current_leader_online = agreed_leader is not None and any(
-            n["uid"] == agreed_leader and n["online"] for n in nodes
-        )
+        agreed_leader = leader if all_agree else None
 
         if prev_leader is not None:
             # Check if previous leader went offline
-            prev_leader_online = any(n["uid"] == prev_leader and n["online"] for n in nodes)
-            if not prev_leader_online and leader_lost_tick is None:
+            if leader_lost_tick is None and not _has_bit(online_mask, prev_leader):
                 leader_lost_tick = tick
                 leader_was_offline = True
                 results["leader_failures"] += 1
@@ -78,10 +187,10 @@ def compute_metrics(states):
         # 1. We had a disruption (leader_lost_tick is set)
         # 2. All online nodes now agree
         # 3. The agreed leader is back online (if it was the one that failed)
-        if leader_lost_tick is not None and all_agree and current_leader_online:
+        if leader_lost_tick is not None and all_agree and _has_bit(online_mask, leader):
             convergence_time = tick - leader_lost_tick
             # Record the convergence time (including 0 for instant recovery)
-            results["convergence_times"].append(convergence_time)
+            convergence_times.append(convergence_time)
             prev_leader = agreed_leader
             leader_lost_tick = None
             leader_was_offline = False
@@ -89,16 +198,143 @@ def compute_metrics(states):
             prev_leader = agreed_leader
 
         # --- Metric 2: Election Rate ---
-        current_elections = {n["uid"] for n in nodes if n["election"]}
-        new_elections = current_elections - prev_elections
-        results["elections_started"] += len(new_elections)
+        # Only bits newly set since the previous active tick count
+        started = current_elections & ~prev_elections
+        if started:
+            elections_started += started.bit_count()
         prev_elections = current_elections
 
         # --- Metric 3: Agreement Ratio ---
         if all_agree:
             results["agreement_ticks"] += 1
 
-    # Compute final metrics
+    results["total_ticks"] = total_ticks
+    results["elections_started"] = elections_started
+    results["convergence_times"] = convergence_times.tolist()
+    return _finalize_metrics(results)
+
+
+def states_to_arrays(states):
+    """Pack decoded states into dense per-tick arrays.
+
+    Returns (ticks, uids, online, leader, election); the last three are
+    (ticks x nodes) matrices. Every tick must list the same nodes in the same
+    order, which is how the controller writes them.
+    """
+    import numpy as np
+
+    fields = np.array([list(map(_node_fields, s.nodes)) for s in states], dtype=np.int64)
+    fields = fields.reshape(len(states), -1, 4)
+    ticks = np.fromiter((s.tick for s in states), dtype=np.int64, count=len(states))
+    uids = fields[0, :, 0] if len(states) else np.empty(0, dtype=np.int64)
+    if not (fields[:, :, 0] == uids).all():
+        raise ValueError("node layout changes between ticks")
+
+    return ticks, uids, fields[:, :, 1].astype(bool), fields[:, :, 2], fields[:, :, 3].astype(bool)
+
+
+def compute_metrics_arrays(ticks, uids, online, leader, election):
+    """Array counterpart of compute_metrics (see states_to_arrays).
+
+    With Numba installed the whole reduction runs as one compiled kernel
+    (metrics_kernels.py); the ahead-of-time build of it, _metrics_kernels,
+    is used when present so no JIT warm-up is paid. Otherwise per-tick
+    reductions (agreement, leader liveness, new elections) run as NumPy
+    operations and only the convergence tracking, which depends on the
+    previous leader, still walks the ticks in Python.
+    """
+    import numpy as np
+
+    results = {
+        "total_ticks": len(ticks),
+        "elections_started": 0,
+        "agreement_ticks": 0,
+        "convergence_times": [],
+        "leader_failures": 0,
+    }
+
+    try:
+        from _metrics_kernels import reduce_metrics
+    except ImportError:
+        try:
+            from metrics_kernels import reduce_metrics
+        except ImportError:
+            reduce_metrics = None
+
+    uid_column = _uid_columns(uids)
+
+    if reduce_metrics is not None:
+        (results["elections_started"], results["agreement_ticks"],
+         results["leader_failures"], convergence_times) = reduce_metrics(
+            ticks, uid_column, online, leader, election)
+        results["convergence_times"] = convergence_times.tolist()
+        return _finalize_metrics(results)
+
+    # Ticks without any online node are skipped entirely
+    active = online.any(axis=1)
+    if not active.any():
+        return _finalize_metrics(results)
+    ticks, online, leader, election = ticks[active], online[active], leader[active], election[active]
+
+    # All online nodes agree when the smallest and largest online view match
+    lo = np.where(online, leader, np.iinfo(leader.dtype).max).min(axis=1)
+    hi = np.where(online, leader, np.iinfo(leader.dtype).min).max(axis=1)
+    all_agree = lo == hi
+    lo_column = uid_column[np.clip(lo, 0, len(uid_column) - 1)]
+    lo_column[(lo < 0) | (lo >= len(uid_column))] = -1
+    leader_online = (lo_column >= 0) & online[np.arange(len(lo)), lo_column]
+
+    # Nodes entering an election since the previous active tick
+    prev_election = np.zeros_like(election)
+    prev_election[1:] = election[:-1]
+    results["elections_started"] = int(np.count_nonzero(election & ~prev_election))
+    results["agreement_ticks"] = int(np.count_nonzero(all_agree))
+
+    # Convergence tracking (see compute_metrics); at most one sample per tick
+    prev_leader = None
+    prev_column = -1
+    leader_lost_tick = None
+    convergence_times = np.empty(len(ticks), dtype=np.int64)
+    num_convergence = 0
+
+    for i, (tick, agree, agreed_leader, agreed_column, agreed_online) in enumerate(
+            zip(ticks.tolist(), all_agree.tolist(), lo.tolist(), lo_column.tolist(),
+                leader_online.tolist())):
+        if prev_leader is not None and leader_lost_tick is None:
+            if prev_column < 0 or not online[i, prev_column]:
+                leader_lost_tick = tick
+                results["leader_failures"] += 1
+
+        if not agree and leader_lost_tick is None:
+            leader_lost_tick = tick
+
+        if leader_lost_tick is not None and agree and agreed_online:
+            convergence_times[num_convergence] = tick - leader_lost_tick
+            num_convergence += 1
+            prev_leader, prev_column = agreed_leader, agreed_column
+            leader_lost_tick = None
+        elif agree and leader_lost_tick is None:
+            prev_leader, prev_column = agreed_leader, agreed_column
+
+    results["convergence_times"] = convergence_times[:num_convergence].tolist()
+    return _finalize_metrics(results)
+
+
+def _uid_columns(uids):
+    """Dense uid -> column table (-1 where no node has that uid).
+
+    Node uids are MPI ranks, so they are small non-negative integers and a
+    table lookup replaces scanning the uid row for a given leader.
+    """
+    import numpy as np
+
+    table = np.full(int(uids.max()) + 1 if len(uids) else 0, -1, dtype=np.int64)
+    table[uids] = np.arange(len(uids))
+    return table
+
+
+def _finalize_metrics(results):
+    """Derive rates and averages from the raw counters."""
     results["election_rate_per_100"] = (results["elections_started"] / results["total_ticks"]) * 100
     results["agreement_ratio"] = results["agreement_ticks"] / results["total_ticks"]
     results["avg_convergence_time"] = (
@@ -122,44 +358,47 @@ def print_report(results):
     print(f"Convergence samples:   {len(results['convergence_times'])}")
     print("=" * 50)
 
+# (source key, results key) pairs applied by add_parameters, in order
+_METADATA_MAP = [("num_nodes", "num_nodes"), ("num_ticks", "num_ticks"), ("seed", "seed")]
+_CONFIG_SIM_MAP = [("num_ticks", "num_ticks"), ("seed", "seed")]
+_CONFIG_NODE_MAP = [
+    ("election_timeout_ticks", "election_timeout"),
+    ("hb_timeout_ticks", "hb_timeout"),
+    ("p_drop", "p_drop"),
+]
+_CONFIG_FAIL_MAP = [("p_fail", "p_fail"), ("leader_fail_multiplier", "leader_fail_multiplier")]
+# Backwards compatibility: failure params in node section
+_CONFIG_NODE_FAIL_MAP = [("p_fail", "p_fail")]
+
+
+def _merge(results, source, mapping):
+    for src, dst in mapping:
+        value = source.get(src)
+        if value is not None:
+            results[dst] = value
+
+
 def add_parameters(results, metadata=None, config=None, params=None):
     """Add simulation parameters to results for easier plotting."""
     # Priority: explicit params > config file > metadata
 
     # From metadata (state_log.jsonl first line)
     if metadata:
-        if "num_nodes" in metadata:
-            results["num_nodes"] = metadata["num_nodes"]
-        if "num_ticks" in metadata:
-            results["num_ticks"] = metadata["num_ticks"]
-        if "seed" in metadata:
-            results["seed"] = metadata["seed"]
+        _merge(results, metadata, _METADATA_MAP)
 
     # From config file
     if config:
-        if "simulation" in config:
-            if "num_ticks" in config["simulation"]:
-                results["num_ticks"] = config["simulation"]["num_ticks"]
-            if "seed" in config["simulation"]:
-                results["seed"] = config["simulation"]["seed"]
-
-        if "node" in config:
-            if "election_timeout_ticks" in config["node"]:
-                results["election_timeout"] = config["node"]["election_timeout_ticks"]
-            if "hb_timeout_ticks" in config["node"]:
-                results["hb_timeout"] = config["node"]["hb_timeout_ticks"]
-            if "p_drop" in config["node"]:
-                results["p_drop"] = config["node"]["p_drop"]
-
-        if "failure" in config:
-            if "p_fail" in config["failure"]:
-                results["p_fail"] = config["failure"]["p_fail"]
-            if "leader_fail_multiplier" in config["failure"]:
-                results["leader_fail_multiplier"] = config["failure"]["leader_fail_multiplier"]
-        # Backwards compatibility: failure params in node section
-        elif "node" in config:
-            if "p_fail" in config["node"]:
-                results["p_fail"] = config["node"]["p_fail"]
+        simulation = config.get("simulation")
+        node = config.get("node")
+        failure = config.get("failure")
+        if simulation is not None:
+            _merge(results, simulation, _CONFIG_SIM_MAP)
+        if node is not None:
+            _merge(results, node, _CONFIG_NODE_MAP)
+        if failure is not None:
+            _merge(results, failure, _CONFIG_FAIL_MAP)
+        elif node is not None:
+            _merge(results, node, _CONFIG_NODE_FAIL_MAP)
 
     # From explicit params (override everything)
     if params:
@@ -168,12 +407,50 @@ def add_parameters(results, metadata=None, config=None, params=None):
     return results
 
 
+def process_log(state_log, config_path=None, params=None, engine="scan", config=None):
+    """Compute metrics for one state log and attach its parameters.
+
+    This is what the command line does, minus printing and saving; batch
+    drivers call it directly instead of spawning a Python per log. A driver
+    that already holds the parsed config can pass it as `config` instead of
+    `config_path`.
+    """
+    if engine == "numpy":
+        states, metadata = load_states_and_metadata(state_log)
+        results = compute_metrics_arrays(*states_to_arrays(states))
+    else:
+        # Stream the log so memory stays flat however long the run was
+        metadata = {}
+        results = compute_metrics(iter_state_records(state_log, metadata))
+
+    if config is None and config_path:
+        config = load_config(config_path)
+    return add_parameters(results, metadata, config, params)
+
+
 def save_results(results, output_path):
     """Save results to JSON file."""
     with open(output_path, 'w') as f:
         json.dump(results, f, indent=2)
 
 
+# Sweeps can collect every run's results, tagged with "run_name", in one
+# zstd-compressed JSON-lines file (see run_experiments.py)
+RESULTS_ARCHIVE = "all.jsonl.zst"
+
+
+def iter_archived_results(path):
+    """Yield the result dicts stored in a results archive, oldest first."""
+    import io
+    import zstandard
+
+    with open(path, 'rb') as f:
+        reader = zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True)
+        for line in io.BufferedReader(reader):
+            if line.strip():
+                yield _json_loads(line)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Compute election metrics from simulation logs")
     parser.add_argument("state_log", nargs="?", default="state_log.jsonl",
@@ -182,6 +459,8 @@ if __name__ == "__main__":
     parser.add_argument("-c", "--config", help="Path to config file to extract parameters")
     parser.add_argument("-s", "--save", help="Save results to JSON file")
     parser.add_argument("-q", "--quiet", action="store_true", help="Suppress output")
+    parser.add_argument("--engine", choices=["scan", "numpy"], default="scan",
+                        help="Metrics engine: per-node scan (default) or NumPy arrays")
 
     # Explicit parameter overrides for batch runs
     parser.add_argument("--nodes", type=int, help="Number of nodes")
@@ -191,12 +470,6 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
 
-    states, metadata = load_states_and_metadata(args.state_log)
-    results = compute_metrics(states)
-
-    # Load config if provided
-    config = load_config(args.config) if args.config else None
-
     # Build explicit params from command line
     explicit_params = {}
     if args.nodes is not None:
@@ -208,8 +481,8 @@ if __name__ == "__main__":
     if args.timeout is not None:
         explicit_params["election_timeout"] = args.timeout
 
-    # Add parameters to results
-    add_parameters(results, metadata, config, explicit_params if explicit_params else None)
+    results = process_log(args.state_log, args.config,
+                          explicit_params if explicit_params else None, args.engine)
 
     if not args.quiet:
         print_report(results)
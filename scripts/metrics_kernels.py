@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""metrics_kernels.py - Numba-compiled reduction kernels for metrics.py.
+
+Run this file once to compile the kernels ahead of time into the
+_metrics_kernels extension module, which metrics.py prefers over the JIT.
+"""
+
+from pathlib import Path
+
+import numpy as np
+from numba import njit
+
+# (ticks, uid_column, online, leader, election) ->
+#     (elections_started, agreement_ticks, leader_failures, convergence_times)
+REDUCE_SIGNATURE = "Tuple((i8, i8, i8, i8[:]))(i8[:], i8[:], b1[:, :], i8[:, :], b1[:, :])"
+
+
+@njit(cache=True)
+def _column(uid_column, uid):
+    """Column of node `uid`, or -1 if no node has that uid."""
+    if uid < 0 or uid >= len(uid_column):
+        return -1
+    return uid_column[uid]
+
+
+@njit(cache=True)
+def reduce_metrics(ticks, uid_column, online, leader, election):
+    """Fused single-pass reduction over dense (ticks x nodes) arrays.
+
+    Mirrors compute_metrics in metrics.py; `uid_column` maps node uids to
+    matrix columns. Returns (elections_started, agreement_ticks,
+    leader_failures, convergence_times), where convergence_times is trimmed
+    to the samples recorded.
+    """
+    num_ticks, num_nodes = online.shape
+
+    elections_started = 0
+    agreement_ticks = 0
+    leader_failures = 0
+    convergence_times = np.empty(num_ticks, dtype=np.int64)
+    num_convergence = 0
+
+    has_prev_leader = False
+    prev_column = -1
+    leader_lost = False
+    leader_lost_tick = 0
+    prev_election = np.zeros(num_nodes, dtype=np.bool_)
+
+    for t in range(num_ticks):
+        online_count = 0
+        leader_view = 0
+        all_agree = True
+
+        for j in range(num_nodes):
+            if not online[t, j]:
+                continue
+            if online_count == 0:
+                leader_view = leader[t, j]
+            elif leader[t, j] != leader_view:
+                all_agree = False
+            online_count += 1
+
+        # Ticks without any online node are skipped entirely
+        if online_count == 0:
+            continue
+
+        tick = ticks[t]
+        leader_column = _column(uid_column, leader_view)
+        leader_online = leader_column >= 0 and online[t, leader_column]
+        prev_leader_online = prev_column >= 0 and online[t, prev_column]
+
+        # Convergence tracking
+        if has_prev_leader and not prev_leader_online and not leader_lost:
+            leader_lost = True
+            leader_lost_tick = tick
+            leader_failures += 1
+
+        if not all_agree and not leader_lost:
+            leader_lost = True
+            leader_lost_tick = tick
+
+        if leader_lost and all_agree and leader_online:
+            convergence_times[num_convergence] = tick - leader_lost_tick
+            num_convergence += 1
+            has_prev_leader = True
+            prev_column = leader_column
+            leader_lost = False
+        elif all_agree and not leader_lost:
+            has_prev_leader = True
+            prev_column = leader_column
+
+        # Nodes entering an election since the previous active tick
+        for j in range(num_nodes):
+            if election[t, j] and not prev_election[j]:
+                elections_started += 1
+            prev_election[j] = election[t, j]
+
+        if all_agree:
+            agreement_ticks += 1
+
+    return elections_started, agreement_ticks, leader_failures, convergence_times[:num_convergence]
+
+
+def build_aot(output_dir=None):
+    """Compile reduce_metrics into the _metrics_kernels extension module."""
+    from numba.pycc import CC
+
+    cc = CC("_metrics_kernels")
+    cc.output_dir = str(output_dir or Path(__file__).resolve().parent)
+    cc.export("reduce_metrics", REDUCE_SIGNATURE)(reduce_metrics.py_func)
+    cc.compile()
+
+
+if __name__ == "__main__":
+    build_aot()
@@ -15,9 +15,23 @@ Usage:
 import json
 import argparse
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Files only: skip interactive backend probing
 import matplotlib.pyplot as plt
+from functools import lru_cache
 from pathlib import Path
+from statistics import fmean, pstdev
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import RESULTS_ARCHIVE, iter_archived_results
+
+# orjson parses result files faster and accepts bytes; fall back to stdlib json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 # Style setup
 try:
@@ -31,33 +45,113 @@ plt.rcParams.update({
     'font.size': 10,
     'axes.titlesize': 12,
     'axes.labelsize': 10,
+    'savefig.dpi': 150,
+    # Cheaper rasterization of long paths
+    'path.simplify_threshold': 1.0,
+    'agg.path.chunksize': 10000,
 })
 
 
-def load_results(results_dir):
-    """Load all JSON result files from directory."""
+_NO_TIMES = np.empty(0, dtype=np.int32)
+
+
+@lru_cache(maxsize=32)
+def _viridis(n, lo=0.25, hi=0.75):
+    """n evenly spaced viridis colors in [lo, hi] (shared array, do not modify)."""
+    return plt.cm.viridis(np.linspace(lo, hi, n))
+
+
+def _prepare_result(data):
+    # Convert once here so every plot gets a ready-made array
+    if 'convergence_times' in data:
+        data['convergence_times'] = np.asarray(data['convergence_times'], dtype=np.int32)
+    return data
+
+
+def _load_result(json_file):
+    return json_file.stem, _prepare_result(_json_loads(json_file.read_bytes()))
+
+
+def load_results(results_dir, max_workers=8):
+    """Load all results from directory: per-run JSON files and the sweep archive.
+
+    Files are read on a small thread pool so disk latency overlaps, which
+    matters for large sweeps or results on network filesystems. Archive
+    records (see run_experiments.py) override files of the same run.
+    """
+    results_dir = Path(results_dir)
     results = {}
-    results_path = Path(results_dir)
-    
-    for json_file in sorted(results_path.glob("*.json")):
-        with open(json_file) as f:
-            results[json_file.stem] = json.load(f)
-    
+
+    files = sorted(results_dir.glob("*.json"))
+    if files:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(files))) as ex:
+            results.update(ex.map(_load_result, files))
+
+    archive = results_dir / RESULTS_ARCHIVE
+    if archive.exists():
+        for data in iter_archived_results(archive):
+            results[data.pop('run_name')] = _prepare_result(data)
+        results = dict(sorted(results.items()))
+
     return results
 
 
+_LABEL_FORMATS = ('n={}', 'pf={}', 'pd={}')
+
+
 def make_label(data):
     """Create readable label from config parameters."""
-    parts = []
-    if data.get('num_nodes'):
-        parts.append(f"n={data['num_nodes']}")
-    if data.get('p_fail') is not None:
-        parts.append(f"pf={data['p_fail']}")
-    if data.get('p_drop') is not None:
-        parts.append(f"pd={data['p_drop']}")
+    return _label(data.get('num_nodes') or None, data.get('p_fail'), data.get('p_drop'))
+
+
+# typed: 0 and 0.0 must not share a cached label
+@lru_cache(maxsize=None, typed=True)
+def _label(num_nodes, p_fail, p_drop):
+    parts = [fmt.format(value) for fmt, value in zip(_LABEL_FORMATS, (num_nodes, p_fail, p_drop))
+             if value is not None]
     return "\n".join(parts) if parts else "config"
 
 
+def _axes_for(ax, figsize):
+    """Return (fig, ax, owned): a new figure, or `ax` cleared for reuse."""
+    if ax is None:
+        fig, ax = plt.subplots(figsize=figsize)
+        return fig, ax, True
+    ax.clear()
+    ax.figure.set_size_inches(figsize)
+    return ax.figure, ax, False
+
+
+def _save_figure(fig, output_path, owned=True):
+    """Save `fig`; figures owned by the plot function are closed afterwards."""
+    fig.tight_layout()
+    fig.savefig(output_path, bbox_inches='tight')
+    if owned:
+        plt.close(fig)
+    print(f"Saved: {output_path}")
+
+
+GROUP_BY_KEYS = ('num_nodes', 'p_fail', 'p_drop')
+
+
+def group_convergence_times(results, group_bys=GROUP_BY_KEYS):
+    """
+    Group convergence times by each parameter in a single pass over results.
+    
+    Returns {group_by: {parameter value: array of convergence times}}.
+    """
+    grouped = {g: defaultdict(list) for g in group_bys}
+    for data in results.values():
+        times = data.get('convergence_times', _NO_TIMES)
+        for g, groups in grouped.items():
+            key = data.get(g)
+            if key is not None:
+                groups[key].append(times)
+    
+    return {g: {k: np.concatenate(v) for k, v in groups.items()}
+            for g, groups in grouped.items()}
+
+
 # ============================================================
 # PLOT 1: Metric Comparison Bar Chart
 # ============================================================
@@ -90,7 +184,7 @@ def plot_metric_comparison(results, output_path):
     # Create figure
     fig, axes = plt.subplots(2, 2, figsize=(14, 10))
     x = np.arange(n)
-    colors = plt.cm.viridis(np.linspace(0.25, 0.75, n))
+    colors = _viridis(n)
     
     # Election Rate
     ax = axes[0, 0]
@@ -133,29 +227,25 @@ def plot_metric_comparison(results, output_path):
     ax.set_xticklabels(labels, fontsize=8)
     ax.legend(loc='upper right')
     
-    plt.tight_layout()
-    plt.savefig(output_path, dpi=150, bbox_inches='tight')
-    plt.close()
-    print(f"Saved: {output_path}")
+    _save_figure(fig, output_path)
 
 
 # ============================================================
 # PLOT 2: Convergence Time Box Plot
 # ============================================================
-def plot_convergence_boxplot(results, output_path, group_by=None):
+def plot_convergence_boxplot(results, output_path, group_by=None, precomputed_group=None, ax=None):
     """
     Box plot showing convergence time distributions.
     
     group_by: None (per config) or 'num_nodes', 'p_fail', 'p_drop'
+    precomputed_group: grouping for group_by from group_convergence_times()
+    ax: existing axes to clear and draw into instead of a new figure
     """
     if group_by:
         # Group by parameter value
-        grouped = defaultdict(list)
-        for config, data in results.items():
-            key = data.get(group_by)
-            if key is not None:
-                times = data.get('convergence_times', [])
-                grouped[key].extend(times)
+        grouped = precomputed_group
+        if grouped is None:
+            grouped = group_convergence_times(results, (group_by,))[group_by]
         
         if not grouped:
             print(f"No data for group_by={group_by}")
@@ -169,7 +259,7 @@ def plot_convergence_boxplot(results, output_path, group_by=None):
     else:
         # Per configuration
         configs = list(results.keys())
-        plot_data = [results[c].get('convergence_times', []) for c in configs]
+        plot_data = [results[c].get('convergence_times', _NO_TIMES) for c in configs]
         labels = [make_label(results[c]) for c in configs]
         title = 'Convergence Time Distribution'
         xlabel = 'Configuration'
@@ -184,12 +274,12 @@ def plot_convergence_boxplot(results, output_path, group_by=None):
     n = len(plot_data)
     
     # Create figure
-    fig, ax = plt.subplots(figsize=(max(10, n * 0.8), 6))
+    fig, ax, owned = _axes_for(ax, (max(10, n * 0.8), 6))
     
     bp = ax.boxplot(plot_data, patch_artist=True, labels=labels)
     
     # Color boxes
-    colors = plt.cm.viridis(np.linspace(0.25, 0.75, n))
+    colors = _viridis(n)
     for patch, color in zip(bp['boxes'], colors):
         patch.set_facecolor(color)
         patch.set_alpha(0.7)
@@ -204,60 +294,58 @@ def plot_convergence_boxplot(results, output_path, group_by=None):
     ax.legend(loc='upper right')
     
     if n > 6:
-        plt.xticks(rotation=45, ha='right')
+        plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
     
-    plt.tight_layout()
-    plt.savefig(output_path, dpi=150, bbox_inches='tight')
-    plt.close()
-    print(f"Saved: {output_path}")
+    _save_figure(fig, output_path, owned)
 
 
 # ============================================================
 # PLOT 3: Convergence Time Histogram
 # ============================================================
-def plot_convergence_histogram(results, output_path, group_by=None):
+def plot_convergence_histogram(results, output_path, group_by=None, precomputed_group=None, ax=None):
     """
     Histogram of convergence times.
     
     group_by: None (all combined) or 'num_nodes', 'p_fail', 'p_drop'
+    precomputed_group: grouping for group_by from group_convergence_times()
+    ax: existing axes to clear and draw into instead of a new figure
     """
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig, ax, owned = _axes_for(ax, (10, 6))
     
     if group_by:
         # Overlay histograms by parameter value
-        grouped = defaultdict(list)
-        for config, data in results.items():
-            key = data.get(group_by)
-            if key is not None:
-                times = data.get('convergence_times', [])
-                grouped[key].extend(times)
+        grouped = precomputed_group
+        if grouped is None:
+            grouped = group_convergence_times(results, (group_by,))[group_by]
         
         if not grouped:
             print(f"No data for group_by={group_by}")
             return
         
         sorted_keys = sorted(grouped.keys())
-        colors = plt.cm.viridis(np.linspace(0.2, 0.8, len(sorted_keys)))
+        colors = _viridis(len(sorted_keys), 0.2, 0.8)
         
         # Find global max for consistent bins
-        all_times = [t for times in grouped.values() for t in times]
-        bins = np.linspace(0, max(all_times) + 1, 25)
+        all_times = np.concatenate(list(grouped.values()))
+        bins = np.linspace(0, all_times.max() + 1, 25)
         
-        for i, key in enumerate(sorted_keys):
-            if grouped[key]:
-                ax.hist(grouped[key], bins=bins, alpha=0.5, 
-                       label=f'{group_by}={key}', color=colors[i], edgecolor='black', linewidth=0.5)
+        # One overlaid hist call for all groups (one patch per group). Step
+        # histograms are added last-to-first, so feed the groups reversed to
+        # keep the first group drawn underneath and listed first.
+        present = [i for i, key in enumerate(sorted_keys) if len(grouped[key])][::-1]
+        ax.hist([grouped[sorted_keys[i]] for i in present], bins=bins, histtype='stepfilled',
+                alpha=0.5, label=[f'{group_by}={sorted_keys[i]}' for i in present],
+                color=[colors[i] for i in present], edgecolor='black', linewidth=0.5)
         
         ax.set_title(f'Convergence Time by {group_by.replace("_", " ").title()}', fontweight='bold')
         ax.legend(loc='upper right')
     
     else:
         # All data combined
-        all_times = []
-        for data in results.values():
-            all_times.extend(data.get('convergence_times', []))
+        all_times = np.concatenate(
+            [data.get('convergence_times', _NO_TIMES) for data in results.values()])
         
-        if not all_times:
+        if not len(all_times):
             print("No convergence data")
             return
         
@@ -274,10 +362,7 @@ def plot_convergence_histogram(results, output_path, group_by=None):
     ax.set_xlabel('Convergence Time (ticks)')
     ax.set_ylabel('Frequency')
     
-    plt.tight_layout()
-    plt.savefig(output_path, dpi=150, bbox_inches='tight')
-    plt.close()
-    print(f"Saved: {output_path}")
+    _save_figure(fig, output_path, owned)
 
 
 # ============================================================
@@ -299,15 +384,17 @@ def plot_scaling(results, output_path):
         return
     
     sorted_nodes = sorted(by_nodes.keys())
+    x = np.asarray(sorted_nodes)
     
-    # Calculate means and stds
+    # Calculate means and stds (a handful of runs per node count, so plain
+    # statistics beats NumPy's per-call overhead)
     def stats(key):
         means = []
         stds = []
         for n in sorted_nodes:
             vals = [d.get(key, 0) for d in by_nodes[n]]
-            means.append(np.mean(vals))
-            stds.append(np.std(vals) if len(vals) > 1 else 0)
+            means.append(fmean(vals))
+            stds.append(pstdev(vals) if len(vals) > 1 else 0.0)
         return means, stds
     
     election_m, election_s = stats('election_rate_per_100')
@@ -319,7 +406,7 @@ def plot_scaling(results, output_path):
     fig, axes = plt.subplots(1, 3, figsize=(14, 4))
     
     ax = axes[0]
-    ax.errorbar(sorted_nodes, election_m, yerr=election_s, fmt='o-', 
+    ax.errorbar(x, election_m, yerr=election_s, fmt='o-', 
                 color='steelblue', linewidth=2, markersize=8, capsize=4)
     ax.set_xlabel('Number of Nodes')
     ax.set_ylabel('Elections per 100 ticks')
@@ -327,7 +414,7 @@ def plot_scaling(results, output_path):
     ax.grid(True, alpha=0.3)
     
     ax = axes[1]
-    ax.errorbar(sorted_nodes, agreement_m, fmt='o-',
+    ax.errorbar(x, agreement_m, fmt='o-',
                 color='seagreen', linewidth=2, markersize=8, capsize=4)
     ax.set_xlabel('Number of Nodes')
     ax.set_ylabel('Agreement (%)')
@@ -336,25 +423,24 @@ def plot_scaling(results, output_path):
     ax.grid(True, alpha=0.3)
     
     ax = axes[2]
-    ax.errorbar(sorted_nodes, convergence_m, yerr=convergence_s, fmt='o-',
+    ax.errorbar(x, convergence_m, yerr=convergence_s, fmt='o-',
                 color='coral', linewidth=2, markersize=8, capsize=4)
     ax.set_xlabel('Number of Nodes')
     ax.set_ylabel('Ticks')
     ax.set_title('Convergence Time', fontweight='bold')
     ax.grid(True, alpha=0.3)
     
-    plt.tight_layout()
-    plt.savefig(output_path, dpi=150, bbox_inches='tight')
-    plt.close()
-    print(f"Saved: {output_path}")
+    _save_figure(fig, output_path)
 
 
 # ============================================================
 # PLOT 5: Heatmap (p_fail vs p_drop)
 # ============================================================
-def plot_heatmap(results, metric, output_path):
+def plot_heatmap(results, metric, output_path, ax=None):
     """
     Heatmap showing metric values across p_fail x p_drop grid.
+    
+    ax: existing axes to clear and draw into instead of a new figure
     """
     # Build grid
     grid = {}
@@ -373,8 +459,11 @@ def plot_heatmap(results, metric, output_path):
         return
     
     # Get unique values
-    p_fails = sorted(set(k[0] for k in grid.keys()))
-    p_drops = sorted(set(k[1] for k in grid.keys()))
+    p_fails, p_drops = set(), set()
+    for pf, pd in grid:
+        p_fails.add(pf)
+        p_drops.add(pd)
+    p_fails, p_drops = sorted(p_fails), sorted(p_drops)
     
     # Build matrix
     matrix = np.full((len(p_fails), len(p_drops)), np.nan)
@@ -384,7 +473,7 @@ def plot_heatmap(results, metric, output_path):
                 matrix[i, j] = grid[(pf, pd)]
     
     # Plot
-    fig, ax = plt.subplots(figsize=(8, 6))
+    fig, ax, owned = _axes_for(ax, (8, 6))
     
     # Choose colormap
     if metric in ['election_rate_per_100', 'avg_convergence_time', 'leader_failures']:
@@ -420,11 +509,10 @@ def plot_heatmap(results, metric, output_path):
                 ax.text(j, i, f'{val:.1f}', ha='center', va='center', 
                        color=color, fontweight='bold', fontsize=9)
     
-    plt.colorbar(im, ax=ax)
-    plt.tight_layout()
-    plt.savefig(output_path, dpi=150, bbox_inches='tight')
-    plt.close()
-    print(f"Saved: {output_path}")
+    cbar = fig.colorbar(im, ax=ax)
+    _save_figure(fig, output_path, owned)
+    if not owned:
+        cbar.remove()  # Give the space back before the axes is reused
 
 
 # ============================================================
@@ -442,25 +530,42 @@ def generate_all(results, output_dir):
     # 1. Metric comparison
     plot_metric_comparison(results, out / 'metric_comparison.png')
     
+    # Group convergence times by every parameter once for plots 2 and 3
+    groupings = group_convergence_times(results)
+    
+    # Single-axes plots of the same kind share one figure, cleared between plots
+    _, ax_box = plt.subplots(figsize=(10, 6))
+    _, ax_hist = plt.subplots(figsize=(10, 6))
+    _, ax_heat = plt.subplots(figsize=(8, 6))
+    
     # 2. Box plots
-    plot_convergence_boxplot(results, out / 'convergence_boxplot.png')
-    plot_convergence_boxplot(results, out / 'convergence_by_nodes.png', group_by='num_nodes')
-    plot_convergence_boxplot(results, out / 'convergence_by_pfail.png', group_by='p_fail')
-    plot_convergence_boxplot(results, out / 'convergence_by_pdrop.png', group_by='p_drop')
+    plot_convergence_boxplot(results, out / 'convergence_boxplot.png', ax=ax_box)
+    plot_convergence_boxplot(results, out / 'convergence_by_nodes.png', group_by='num_nodes',
+                             precomputed_group=groupings['num_nodes'], ax=ax_box)
+    plot_convergence_boxplot(results, out / 'convergence_by_pfail.png', group_by='p_fail',
+                             precomputed_group=groupings['p_fail'], ax=ax_box)
+    plot_convergence_boxplot(results, out / 'convergence_by_pdrop.png', group_by='p_drop',
+                             precomputed_group=groupings['p_drop'], ax=ax_box)
     
     # 3. Histograms
-    plot_convergence_histogram(results, out / 'convergence_histogram.png')
-    plot_convergence_histogram(results, out / 'histogram_by_nodes.png', group_by='num_nodes')
-    plot_convergence_histogram(results, out / 'histogram_by_pfail.png', group_by='p_fail')
-    plot_convergence_histogram(results, out / 'histogram_by_pdrop.png', group_by='p_drop')
+    plot_convergence_histogram(results, out / 'convergence_histogram.png', ax=ax_hist)
+    plot_convergence_histogram(results, out / 'histogram_by_nodes.png', group_by='num_nodes',
+                               precomputed_group=groupings['num_nodes'], ax=ax_hist)
+    plot_convergence_histogram(results, out / 'histogram_by_pfail.png', group_by='p_fail',
+                               precomputed_group=groupings['p_fail'], ax=ax_hist)
+    plot_convergence_histogram(results, out / 'histogram_by_pdrop.png', group_by='p_drop',
+                               precomputed_group=groupings['p_drop'], ax=ax_hist)
     
     # 4. Scaling
     plot_scaling(results, out / 'scaling.png')
     
     # 5. Heatmaps
-    plot_heatmap(results, 'election_rate_per_100', out / 'heatmap_election.png')
-    plot_heatmap(results, 'agreement_ratio', out / 'heatmap_agreement.png')
-    plot_heatmap(results, 'avg_convergence_time', out / 'heatmap_convergence.png')
+    plot_heatmap(results, 'election_rate_per_100', out / 'heatmap_election.png', ax=ax_heat)
+    plot_heatmap(results, 'agreement_ratio', out / 'heatmap_agreement.png', ax=ax_heat)
+    plot_heatmap(results, 'avg_convergence_time', out / 'heatmap_convergence.png', ax=ax_heat)
+    
+    for ax in (ax_box, ax_hist, ax_heat):
+        plt.close(ax.figure)
     
     print(f"\n{'='*50}")
     print(f"Done! Generated {len(list(out.glob('*.png')))} plots")
@@ -483,14 +588,16 @@ Examples:
         """
     )
     
-    parser.add_argument('results_dir', help='Directory with result JSON files')
+    parser.add_argument('results_dir', help='Directory with result JSON files or archive')
     parser.add_argument('-o', '--output', default='plots', help='Output directory')
     parser.add_argument('-p', '--plot', 
                         choices=['all', 'comparison', 'boxplot', 'histogram', 'scaling', 'heatmap'],
                         default='all', help='Plot type')
     parser.add_argument('-g', '--group-by',
-                        choices=['num_nodes', 'p_fail', 'p_drop'],
+                        choices=GROUP_BY_KEYS,
                         help='Group by parameter')
+    parser.add_argument('--fast', action='store_true',
+                        help='Save at 100 dpi instead of 150 for quicker iteration')
     parser.add_argument('-m', '--metric',
                         choices=['election_rate_per_100', 'agreement_ratio', 'avg_convergence_time', 'leader_failures'],
                         default='election_rate_per_100',
@@ -498,18 +605,28 @@ Examples:
     
     args = parser.parse_args()
     
+    if args.fast:
+        plt.rcParams['savefig.dpi'] = 100
+    
     # Load results
     results = load_results(args.results_dir)
     if not results:
-        print(f"Error: No JSON files found in {args.results_dir}")
+        print(f"Error: No results found in {args.results_dir}")
         return 1
     
     print(f"Loaded {len(results)} results")
     
     # Show data summary
-    nodes = sorted(set(d.get('num_nodes') for d in results.values() if d.get('num_nodes')))
-    pfails = sorted(set(d.get('p_fail') for d in results.values() if d.get('p_fail') is not None))
-    pdrops = sorted(set(d.get('p_drop') for d in results.values() if d.get('p_drop') is not None))
+    nodes, pfails, pdrops = set(), set(), set()
+    for d in results.values():
+        n, pf, pd = d.get('num_nodes'), d.get('p_fail'), d.get('p_drop')
+        if n:
+            nodes.add(n)
+        if pf is not None:
+            pfails.add(pf)
+        if pd is not None:
+            pdrops.add(pd)
+    nodes, pfails, pdrops = sorted(nodes), sorted(pfails), sorted(pdrops)
     
     print(f"  num_nodes: {nodes}")
     print(f"  p_fail:    {pfails}")
@@ -1,13 +1,22 @@
 #!/usr/bin/env python3
 """run_experiments.py - Run simulation experiments across parameter space."""
 
+import hashlib
 import json
+import os
 import subprocess
 import argparse
+import selectors
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from functools import lru_cache
 from itertools import product
+from math import prod
 import shutil
 import sys
+from typing import NamedTuple
 
 # ============================================================
 # Path Resolution
@@ -16,6 +25,28 @@ import sys
 SCRIPT_DIR = Path(__file__).parent.resolve()
 PROJECT_DIR = SCRIPT_DIR.parent
 
+# metrics.py lives next to this script; make it importable from anywhere
+sys.path.insert(0, str(SCRIPT_DIR))
+from metrics import RESULTS_ARCHIVE, iter_archived_results, process_log, save_results
+
+# orjson serializes configs considerably faster; fall back to stdlib json
+# with the same compact, key-sorted output
+try:
+    import orjson
+
+    def _dump_config(config):
+        return orjson.dumps(config, option=orjson.OPT_SORT_KEYS)
+except ImportError:
+    def _dump_config(config):
+        return json.dumps(config, separators=(',', ':'), sort_keys=True).encode()
+
+# zstandard lets a sweep append all results to one compressed archive
+# instead of writing a small JSON file per run
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 def find_executable():
     """Find the simulation executable in common locations."""
     candidates = [
@@ -31,10 +62,6 @@ def find_executable():
 
     return None
 
-def get_metrics_script():
-    """Get path to metrics.py script."""
-    return SCRIPT_DIR / "metrics.py"
-
 # ============================================================
 # Configuration
 # ============================================================
@@ -80,70 +107,253 @@ BASE_CONFIG = {
 # Helpers
 # ============================================================
 
+# typed: 0 and 0.0 format differently, so they must not share an entry
+@lru_cache(maxsize=None, typed=True)
 def config_name(nodes, p_fail, p_drop, timeout):
     """Generate config name from parameters."""
     return f"n{nodes}_pf{p_fail}_pd{p_drop}_t{timeout}"
 
 def generate_config(nodes, p_fail, p_drop, timeout, seed=12345):
     """Generate config dict for given parameters."""
-    config = json.loads(json.dumps(BASE_CONFIG))  # Deep copy
+    # Fresh copies of every section; lists in "failure" stay shared since
+    # nothing mutates them
+    return {
+        **BASE_CONFIG,
+        "simulation": {**BASE_CONFIG["simulation"], "seed": seed},
+        "node": {**BASE_CONFIG["node"], "election_timeout_ticks": timeout, "p_drop": p_drop},
+        "failure": {**BASE_CONFIG["failure"], "p_fail": p_fail},
+        "logging": dict(BASE_CONFIG["logging"]),
+    }
 
-    config["simulation"]["seed"] = seed
-    config["node"]["election_timeout_ticks"] = timeout
-    config["node"]["p_drop"] = p_drop
-    config["failure"]["p_fail"] = p_fail
+class Paths(NamedTuple):
+    """Filesystem paths of one run, as strings built once per job."""
+    run_dir: str
+    cfg: str
+    state: str
+    msg: str
+    dbg: str
+    result: str
+
+def run_paths(configs_dir, logs_dir, results_dir, run_name):
+    """Paths of run `run_name`, given the sweep's directories as strings."""
+    run_dir = f"{logs_dir}/{run_name}"
+    return Paths(
+        run_dir=run_dir,
+        cfg=f"{configs_dir}/{run_name}.json",
+        state=f"{run_dir}/state_log.jsonl",
+        msg=f"{run_dir}/message_log.jsonl",
+        dbg=f"{run_dir}/debug_log.jsonl",
+        result=f"{results_dir}/{run_name}.json",
+    )
 
-    return config
+@lru_cache(maxsize=None)
+def _mpirun():
+    # An absolute path spares each launch the PATH search (and is required
+    # for subprocess to use posix_spawn)
+    return shutil.which("mpirun") or "mpirun"
 
-def run_simulation(executable, config_path, num_nodes, mpi_args=None):
-    """Run MPI simulation."""
+def simulation_command(executable, config_path, num_nodes, mpi_args=None):
+    """Build the mpirun command line for one simulation."""
     np = num_nodes + 1  # +1 for controller
 
-    cmd = ["mpirun", "--oversubscribe", "-np", str(np)]
+    cmd = [_mpirun(), "--oversubscribe", "-np", str(np)]
 
     if mpi_args:
         cmd.extend(mpi_args.split())
 
     cmd.extend([executable, "-config", str(config_path)])
+    return cmd
+
+def _simulation_env():
+    # One thread per rank; concurrent runs would otherwise oversubscribe cores
+    return {**os.environ, "OMP_NUM_THREADS": "1"}
+
+_STDERR_TAIL = 4096  # Bytes of simulator stderr kept per run
+_ERROR_LINES = 3  # Lines of it shown for a failed run...
+_ERROR_CHARS = 200  # ...and at most this many characters
+
+def _error_summary(stderr):
+    """The last few whole lines of a failed run's stderr, for the report."""
+    lines = stderr.rstrip().splitlines()[-_ERROR_LINES:]
+    separator = "\n           "  # Lines up under the "    Error: " prefix
+    while len(lines) > 1 and len(separator.join(lines)) > _ERROR_CHARS:
+        lines.pop(0)
+    # A single overlong line keeps its end, where the error usually is
+    return separator.join(lines)[-_ERROR_CHARS:]
+
+def start_simulation(selector, executable, config_path, num_nodes, mpi_args=None, data=None):
+    """Launch MPI simulation without waiting; `selector` supervises it.
+
+    stdout is discarded (the logs go to files); stderr is piped and drained
+    by wait_simulation, which hands `data` back when the run exits.
+    """
+    cmd = simulation_command(executable, config_path, num_nodes, mpi_args)
+    # close_fds=False lets subprocess launch via posix_spawn rather than
+    # fork+exec; Python's own descriptors are non-inheritable regardless
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            env=_simulation_env(), close_fds=False)
+    selector.register(proc.stderr, selectors.EVENT_READ, (proc, bytearray(), data))
+    return proc
+
+def wait_simulation(selector):
+    """Drain stderr of every supervised run until one reaches EOF; reap it.
+
+    Returns (proc, stderr, data), where stderr is at most the last
+    _STDERR_TAIL bytes the run wrote, starting at a line boundary.
+    """
+    while True:
+        for key, _ in selector.select():
+            proc, tail, data = key.data
+            chunk = os.read(key.fd, 65536)
+            if chunk:
+                tail += chunk
+                cut = len(tail) - _STDERR_TAIL
+                if cut > 0:
+                    # Output is being cut; drop the partial first line too,
+                    # unless the cut falls on a line boundary
+                    truncated_line = tail[cut - 1] != ord("\n")
+                    if truncated_line:
+                        newline = tail.find(b"\n", cut)
+                        if newline >= 0:
+                            cut = newline + 1
+                    del tail[:cut]
+                continue
+            selector.unregister(key.fileobj)
+            key.fileobj.close()
+            proc.wait()
+            return proc, tail.decode(errors="replace"), data
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
+def run_simulation(executable, config_path, num_nodes, mpi_args=None):
+    """Run MPI simulation.
 
-    return result.returncode == 0, result.stdout, result.stderr
+    Returns (success, stdout, stderr); stdout is not kept and stderr is
+    the tail of what the run wrote.
+    """
+    with selectors.DefaultSelector() as selector:
+        start_simulation(selector, executable, config_path, num_nodes, mpi_args)
+        proc, stderr, _ = wait_simulation(selector)
 
-def compute_metrics(state_log, message_log, output_json, config_file=None,
-                    nodes=None, p_fail=None, p_drop=None, timeout=None):
-    """Run metrics.py to compute metrics."""
-    metrics_script = get_metrics_script()
-
-    cmd = [
-        sys.executable, str(metrics_script),
-        str(state_log),
-        "-m", str(message_log),
-        "-s", str(output_json),
-        "-q"  # Quiet mode for batch runs
-    ]
-
-    # Add config file for parameter extraction
-    if config_file:
-        cmd.extend(["-c", str(config_file)])
+    return proc.returncode == 0, "", stderr
 
-    # Add explicit parameters
+def compute_metrics(state_log, message_log, output_json, config_file=None,
+                    nodes=None, p_fail=None, p_drop=None, timeout=None, config=None,
+                    cfg_hash=None):
+    """Compute metrics in-process with metrics.process_log and save them.
+
+    `config` is the parsed contents of `config_file`, if the caller has it;
+    `cfg_hash` is stored in the results so later sweeps can skip the run.
+    With `output_json` None nothing is saved. Returns the results, or None
+    if metrics could not be computed or saved.
+    """
+    # Explicit parameters, keyed as metrics.py's command line maps them
+    params = {}
     if nodes is not None:
-        cmd.extend(["--nodes", str(nodes)])
+        params["num_nodes"] = nodes
     if p_fail is not None:
-        cmd.extend(["--p-fail", str(p_fail)])
+        params["p_fail"] = p_fail
     if p_drop is not None:
-        cmd.extend(["--p-drop", str(p_drop)])
+        params["p_drop"] = p_drop
     if timeout is not None:
-        cmd.extend(["--timeout", str(timeout)])
-
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    return result.returncode == 0
+        params["election_timeout"] = timeout
+
+    try:
+        results = process_log(state_log, config_file, params or None, config=config)
+        if cfg_hash is not None:
+            results["cfg_hash"] = cfg_hash
+        if output_json is not None:
+            save_results(results, output_json)
+    except Exception:
+        return None
+    return results
 
 # ============================================================
 # Main Experiment Runner
 # ============================================================
 
+def _build_config(job):
+    """The job's full config, with its logs pointed at the run directory."""
+    paths = job["paths"]
+    config = generate_config(job["nodes"], job["p_fail"], job["p_drop"], job["timeout"], job["seed"])
+
+    logging = config["logging"]
+    logging["state_log_file"] = paths.state
+    logging["message_log_file"] = paths.msg
+    logging["debug_log_file"] = paths.dbg
+    return config
+
+def config_hash(config):
+    """Short stable hash of a fully materialized config (seed included)."""
+    return hashlib.blake2b(json.dumps(config, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+def _result_is_current(job):
+    """Whether the job's result file was computed from this exact config."""
+    try:
+        with open(job["paths"].result, 'rb') as f:
+            return json.load(f).get("cfg_hash") == job["cfg_hash"]
+    except (OSError, ValueError):
+        return False
+
+def _write_config(job):
+    """Create the job's run directory and write its config."""
+    paths = job["paths"]
+    try:
+        os.mkdir(paths.run_dir)
+    except FileExistsError:
+        pass
+
+    with open(paths.cfg, 'wb') as f:
+        f.write(_dump_config(job["config"]))
+
+def _run_metrics(job):
+    """Compute metrics for a finished simulation.
+
+    Returns (messages, record): report lines, plus the results to append to
+    the sweep archive when the job uses one (None otherwise).
+    """
+    messages = [f"  ✓ Simulation completed"]
+    record = None
+
+    paths = job["paths"]
+
+    if os.path.exists(paths.state):
+        results = compute_metrics(
+            paths.state, paths.msg, None if job["archive"] else paths.result,
+            config_file=paths.cfg,
+            nodes=job["nodes"],
+            p_fail=job["p_fail"],
+            p_drop=job["p_drop"],
+            timeout=job["timeout"],
+            config=job["config"],
+            cfg_hash=job["cfg_hash"]
+        )
+        if results is not None:
+            messages.append(f"  ✓ Metrics computed")
+            if job["archive"]:
+                record = {"run_name": job["run_name"], **results}
+        else:
+            messages.append(f"  ✗ Metrics computation failed")
+    else:
+        messages.append(f"  ✗ State log not found")
+
+    return messages, record
+
+def default_jobs(nodes_list):
+    """Concurrent runs that fit on this host, each needing max(nodes)+1 ranks."""
+    return max(1, (os.cpu_count() or 1) // (max(nodes_list) + 1))
+
+def cpu_slots(jobs_parallel, width):
+    """Disjoint CPU lists (mpirun --cpu-set syntax), one per concurrent run.
+
+    Returns None when `jobs_parallel` slots of `width` CPUs do not fit in
+    this process's affinity mask.
+    """
+    if not hasattr(os, "sched_getaffinity"):
+        return None
+    cpus = sorted(os.sched_getaffinity(0))
+    if jobs_parallel * width > len(cpus):
+        return None
+    return [",".join(map(str, cpus[i * width:(i + 1) * width])) for i in range(jobs_parallel)]
+
 def run_experiments(
     executable,
     output_dir,
@@ -154,22 +364,48 @@ def run_experiments(
     num_runs=1,
     seed_base=12345,
     mpi_args=None,
-    dry_run=False
+    dry_run=False,
+    jobs_parallel=None,
+    force=False,
+    config_dir=None,
+    per_run_results=False
 ):
-    """Run all experiments in parameter space."""
+    """Run all experiments in parameter space, `jobs_parallel` at a time.
+
+    Runs with an up-to-date result are skipped unless `force` is set.
+    Configs are written to `config_dir` and kept; without it they go to a
+    scratch directory in RAM and each is removed once its run has finished
+    (the results record every parameter). Results are appended to one
+    compressed archive in the results directory when zstandard is installed,
+    or written as a JSON file per run with `per_run_results`.
+    """
 
     output_path = Path(output_dir)
-    configs_path = output_path / "configs"
     logs_path = output_path / "logs"
     results_path = output_path / "results"
 
+    archive_path = results_path / RESULTS_ARCHIVE
+    use_archive = zstandard is not None and not per_run_results
+
     # Create directories
-    for p in [output_path, configs_path, logs_path, results_path]:
+    for p in [output_path, logs_path, results_path]:
         p.mkdir(parents=True, exist_ok=True)
 
     # Generate experiment list
-    experiments = list(product(nodes_list, p_fail_list, p_drop_list, timeout_list))
-    total = len(experiments) * num_runs
+    # Enumerated lazily; the count alone comes from the list lengths
+    param_space = (nodes_list, p_fail_list, p_drop_list, timeout_list)
+    num_experiments = prod(map(len, param_space))
+    total = num_experiments * num_runs
+
+    if jobs_parallel is None:
+        jobs_parallel = default_jobs(nodes_list)
+    # Concurrent mpiruns must not pin their ranks to the same cores: give each
+    # run slot its own CPUs when they fit, otherwise leave placement to the OS
+    slots = None
+    if jobs_parallel > 1 and not any(opt in (mpi_args or "") for opt in ("--bind-to", "--cpu-set")):
+        slots = cpu_slots(jobs_parallel, max(nodes_list) + 1)
+        if slots is None:
+            mpi_args = f"--bind-to none {mpi_args}" if mpi_args else "--bind-to none"
 
     print(f"=" * 60)
     print(f"EXPERIMENT PLAN")
@@ -180,87 +416,144 @@ def run_experiments(
     print(f"  p_drop:  {p_drop_list}")
     print(f"  timeout: {timeout_list}")
     print(f"-" * 60)
-    print(f"Total configurations: {len(experiments)}")
+    print(f"Total configurations: {num_experiments}")
     print(f"Runs per config:      {num_runs}")
     print(f"Total runs:           {total}")
+    print(f"Parallel jobs:        {jobs_parallel}")
     print(f"Output directory:     {output_dir}")
     print(f"Executable:           {executable}")
     print(f"=" * 60)
 
     if dry_run:
         print("\n[DRY RUN] Would run the following experiments:")
-        for nodes, p_fail, p_drop, timeout in experiments:
-            name = config_name(nodes, p_fail, p_drop, timeout)
-            print(f"  - {name}")
+        # One write for the whole list; large sweeps list thousands of names
+        names = [config_name(*experiment) for experiment in product(*param_space)]
+        if names:
+            sys.stdout.write("  - " + "\n  - ".join(names) + "\n")
         return
 
-    # Run experiments
-    completed = 0
-    failed = []
-
-    for nodes, p_fail, p_drop, timeout in experiments:
-        name = config_name(nodes, p_fail, p_drop, timeout)
-
-        for run_idx in range(num_runs):
-            run_name = f"{name}_r{run_idx}" if num_runs > 1 else name
-            seed = seed_base + run_idx
-
-            print(f"\n[{completed + 1}/{total}] Running: {run_name}")
-
-            # Generate config
-            config = generate_config(nodes, p_fail, p_drop, timeout, seed)
-            config_file = configs_path / f"{run_name}.json"
-
-            with open(config_file, 'w') as f:
-                json.dump(config, f, indent=2)
-
-            # Create run directory
-            run_log_dir = logs_path / run_name
-            run_log_dir.mkdir(exist_ok=True)
-
-            # Update log paths in config
-            config["logging"]["state_log_file"] = str(run_log_dir / "state_log.jsonl")
-            config["logging"]["message_log_file"] = str(run_log_dir / "message_log.jsonl")
-            config["logging"]["debug_log_file"] = str(run_log_dir / "debug_log.jsonl")
-
-            with open(config_file, 'w') as f:
-                json.dump(config, f, indent=2)
-
-            # Run simulation
-            success, stdout, stderr = run_simulation(executable, config_file, nodes, mpi_args)
-
-            if not success:
-                print(f"  ✗ Simulation failed")
-                if stderr:
-                    print(f"    Error: {stderr[:200]}")
-                failed.append(run_name)
-                completed += 1
-                continue
+    keep_configs = config_dir is not None
+    if keep_configs:
+        configs_path = Path(config_dir)
+        configs_path.mkdir(parents=True, exist_ok=True)
+    else:
+        shm = Path("/dev/shm")
+        configs_path = Path(tempfile.mkdtemp(prefix="bully-cfg-", dir=shm if shm.is_dir() else None))
+
+    # The archive writer and temporary config directory are released even
+    # when the sweep is interrupted
+    archive = None
+    try:
+        # Build the job list up front; each job is independent
+        configs_dir, logs_dir, results_dir = str(configs_path), str(logs_path), str(results_path)
+        jobs = []
+        for nodes, p_fail, p_drop, timeout in product(*param_space):
+            name = config_name(nodes, p_fail, p_drop, timeout)
 
-            print(f"  ✓ Simulation completed")
-
-            # Compute metrics
-            state_log = run_log_dir / "state_log.jsonl"
-            message_log = run_log_dir / "message_log.jsonl"
-            result_file = results_path / f"{run_name}.json"
-
-            if state_log.exists():
-                success = compute_metrics(
-                    state_log, message_log, result_file,
-                    config_file=config_file,
-                    nodes=nodes,
-                    p_fail=p_fail,
-                    p_drop=p_drop,
-                    timeout=timeout
-                )
-                if success:
-                    print(f"  ✓ Metrics computed")
+            for run_idx in range(num_runs):
+                run_name = f"{name}_r{run_idx}" if num_runs > 1 else name
+                job = {
+                    "run_name": run_name,
+                    "nodes": nodes,
+                    "p_fail": p_fail,
+                    "p_drop": p_drop,
+                    "timeout": timeout,
+                    "seed": seed_base + run_idx,
+                    "executable": executable,
+                    "mpi_args": mpi_args,
+                    "paths": run_paths(configs_dir, logs_dir, results_dir, run_name),
+                    "archive": use_archive,
+                }
+                job["config"] = _build_config(job)
+                job["cfg_hash"] = config_hash(job["config"])
+                jobs.append(job)
+
+        # Run experiments: keep up to jobs_parallel simulations in flight under
+        # one selector, reap whichever finishes first and hand its metrics to a
+        # worker process (metrics is CPU-bound Python, so threads would just
+        # queue on the GIL) while the next simulation starts
+        completed = 0
+        failed = []
+
+        def report(run_name, messages):
+            nonlocal completed
+            completed += 1
+            print(f"\n[{completed}/{total}] {run_name}")
+            for message in messages:
+                print(message)
+
+        def collect(run_name, future):
+            messages, record = future.result()
+            if record is not None:
+                # One frame per record, so an interrupted sweep leaves a readable archive
+                archive.write(json.dumps(record).encode() + b"\n")
+                archive.flush(zstandard.FLUSH_FRAME)
+            report(run_name, messages)
+
+        # Runs whose result already matches their config are not repeated
+        if not force:
+            # One directory listing instead of a failed open() per new run
+            existing = {entry.name for entry in os.scandir(results_path)}
+            archived = {}
+            if zstandard is not None and RESULTS_ARCHIVE in existing:
+                # Later records supersede earlier ones for the same run
+                archived = {r["run_name"]: r.get("cfg_hash") for r in iter_archived_results(archive_path)}
+            pending = []
+            for job in jobs:
+                if archived.get(job["run_name"]) == job["cfg_hash"] or (
+                        f"{job['run_name']}.json" in existing and _result_is_current(job)):
+                    report(job["run_name"], [f"  ✓ Up to date, skipped"])
+                else:
+                    pending.append(job)
+            jobs = pending
+
+        queue = deque(jobs)
+        in_flight = 0
+        free_slots = list(range(jobs_parallel))
+        metrics_futures = {}
+        if use_archive and jobs:
+            archive = zstandard.ZstdCompressor().stream_writer(open(archive_path, 'ab'))
+
+        with selectors.DefaultSelector() as selector, \
+                ProcessPoolExecutor(max_workers=os.cpu_count()) as metrics_pool:
+            while queue or in_flight:
+                while queue and in_flight < jobs_parallel:
+                    job = queue.popleft()
+                    _write_config(job)
+                    job["slot"] = free_slots.pop()
+                    run_mpi_args = job["mpi_args"]
+                    if slots:
+                        run_mpi_args = f"--cpu-set {slots[job['slot']]} --bind-to core {run_mpi_args or ''}".strip()
+                    start_simulation(selector, job["executable"], job["paths"].cfg, job["nodes"],
+                                     run_mpi_args, data=job)
+                    in_flight += 1
+
+                proc, stderr, job = wait_simulation(selector)
+                in_flight -= 1
+                free_slots.append(job["slot"])
+                if not keep_configs:
+                    os.unlink(job["paths"].cfg)
+
+                if proc.returncode != 0:
+                    messages = [f"  ✗ Simulation failed"]
+                    if stderr:
+                        # The end of stderr carries the error (e.g. mpirun's abort summary)
+                        messages.append(f"    Error: {_error_summary(stderr)}")
+                    failed.append(job["run_name"])
+                    report(job["run_name"], messages)
                 else:
-                    print(f"  ✗ Metrics computation failed")
-            else:
-                print(f"  ✗ State log not found")
+                    metrics_futures[metrics_pool.submit(_run_metrics, job)] = job["run_name"]
 
-            completed += 1
+                for future in [f for f in metrics_futures if f.done()]:
+                    collect(metrics_futures.pop(future), future)
+
+            for future in as_completed(metrics_futures):
+                collect(metrics_futures[future], future)
+    finally:
+        if archive is not None:
+            archive.close()
+        if not keep_configs:
+            shutil.rmtree(configs_path, ignore_errors=True)
 
     # Summary
     print(f"\n" + "=" * 60)
@@ -349,6 +642,14 @@ Project directory: {PROJECT_DIR}
                         help="Additional MPI arguments")
     parser.add_argument("--dry-run", action="store_true",
                         help="Show what would be run without running")
+    parser.add_argument("--config-dir", default=None,
+                        help="Keep generated configs here (default: scratch dir in /dev/shm, removed)")
+    parser.add_argument("--legacy-per-run-results", action="store_true",
+                        help=f"Write one JSON file per run instead of results/{RESULTS_ARCHIVE}")
+    parser.add_argument("--force", action="store_true",
+                        help="Rerun experiments even if their results are up to date")
+    parser.add_argument("--jobs", "-j", type=int, default=None,
+                        help="Concurrent runs (default: CPU count // (max nodes + 1))")
 
     # Custom parameter space
     parser.add_argument("--nodes", type=int, nargs="+", help="Node counts")
@@ -402,5 +703,9 @@ Project directory: {PROJECT_DIR}
         num_runs=args.runs,
         seed_base=args.seed,
         mpi_args=args.mpi_args,
-        dry_run=args.dry_run
+        dry_run=args.dry_run,
+        jobs_parallel=args.jobs,
+        force=args.force,
+        config_dir=args.config_dir,
+        per_run_results=args.legacy_per_run_results
     )
@@ -46,29 +46,178 @@ Usage:
 """
 
 import json
+import mmap
+import os
 import argparse
+from bisect import bisect_left
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Dict, List, Set, Optional, Tuple
+from enum import Enum
+from functools import cached_property
+from itertools import chain, islice
+from operator import attrgetter, lt
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# The str mixin makes members hash with str.__hash__ rather than the much
+# slower Enum.__hash__; they are looked up in _TYPE_CODES per message
+class MsgType(str, Enum):
+    """Message types, as named in the message log (see src/logger.hpp)."""
+    HEARTBEAT = 'HEARTBEAT'
+    ELECTION = 'ELECTION'
+    OK = 'OK'
+    COORDINATOR = 'COORDINATOR'
+    PING = 'PING'
+    ACK = 'ACK'
+    STATE_REPORT = 'STATE_REPORT'
+    UNKNOWN = 'UNKNOWN'
+
+
+class Direction(str, Enum):
+    SEND = 'send'
+    RECV = 'recv'
+
+
+# One message per row; type and direction are stored as their index in
+# MSG_TYPES and DIRECTIONS
+MSG_TYPES = list(MsgType)
+DIRECTIONS = list(Direction)
+_TYPE_CODES = {t: i for i, t in enumerate(MSG_TYPES)}
+_DIRECTION_CODES = {d: i for i, d in enumerate(DIRECTIONS)}
+
+MESSAGE_DTYPE = np.dtype([('tick', 'i4'), ('type', 'u1'), ('src', 'i2'),
+                          ('dst', 'i2'), ('dropped', '?'), ('dir', 'u1')])
+
+
+# orjson parses the raw bytes lines faster than stdlib json, which decodes
+# them to str first; used for the metadata record and when msgspec is missing
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# msgspec decodes log lines straight into the record types below, skipping
+# the intermediate dicts; fall back to stdlib json when it is not installed
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+if msgspec is not None:
+    # Frozen: validators only read the records
+    class NodeState(msgspec.Struct, frozen=True):
+        uid: int
+        online: bool
+        leader: int
+        election: bool
+        last_hb: int
+
+    class Message(msgspec.Struct, frozen=True):
+        tick: int
+        type: MsgType
+        src: int
+        dst: int
+        dropped: bool
+        direction: Direction = msgspec.field(name='dir')
+
+    class TickRecord(msgspec.Struct):
+        tick: int
+        nodes: List[NodeState]
+
+    _decode_tick = msgspec.json.Decoder(TickRecord).decode
+    _decode_message = msgspec.json.Decoder(Message).decode
+
+    def _message_row(line):
+        m = _decode_message(line)
+        return (m.tick, _TYPE_CODES[m.type], m.src, m.dst, m.dropped,
+                _DIRECTION_CODES[m.direction])
+    _DecodeError = msgspec.DecodeError
+
+else:
+    @dataclass(slots=True, frozen=True)
+    class NodeState:
+        uid: int
+        online: bool
+        leader: int
+        election: bool
+        last_hb: int
+
+    @dataclass(slots=True, frozen=True)
+    class Message:
+        tick: int
+        type: MsgType
+        src: int
+        dst: int
+        dropped: bool
+        direction: Direction
+
+    class TickRecord(NamedTuple):
+        tick: int
+        nodes: List[NodeState]
+
+    def _decode_tick(line):
+        data = _json_loads(line)
+        return TickRecord(data['tick'], [
+            NodeState(
+                uid=n['uid'],
+                online=n['online'],
+                leader=n['leader'],
+                election=n['election'],
+                last_hb=n['last_hb']
+            )
+            for n in data['nodes']
+        ])
 
+    def _message_row(line):
+        data = _json_loads(line)
+        return (data['tick'], _TYPE_CODES[MsgType(data['type'])], data['src'], data['dst'],
+                data['dropped'], _DIRECTION_CODES[Direction(data['dir'])])
 
-@dataclass
-class NodeState:
+    _DecodeError = json.JSONDecodeError  # orjson's error subclasses it
+
+
+def _read_lines(path: str):
+    """Yield the lines of a log file as bytes, read through a memory map.
+
+    The OS pages the file in as it is scanned, and lines go to the decoder
+    without a UTF-8 decode into str first.
+    """
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty files cannot be mapped
+            return
+    with mm:
+        yield from iter(mm.readline, b'')
+
+
+_state_fields = attrgetter('uid', 'online', 'leader', 'election', 'last_hb')
+
+# Violations kept per rule; ValidationResult only prints the first 10
+MAX_STORED_VIOLATIONS = 100
+
+
+def _any_between(ticks: np.ndarray, lo: int, hi: int) -> bool:
+    """Does the sorted array `ticks` hold a value in [lo, hi]?"""
+    return np.searchsorted(ticks, hi, side='right') > np.searchsorted(ticks, lo)
+
+
+class ElectionSpan(NamedTuple):
     uid: int
-    online: bool
-    leader: int
-    election: bool
-    last_hb: int
+    start: int  # First tick of the election
+    end: int  # Tick at which it was over
 
 
-@dataclass
-class Message:
-    tick: int
-    type: str
-    src: int
-    dst: int
-    dropped: bool
-    direction: str  # 'send' or 'recv'
+class ElectionTransitions(NamedTuple):
+    """Per-node election transitions, found in one pass over the ticks."""
+    spans: List[ElectionSpan]  # Election flag on until it turns off at the next tick
+    online_spans: List[ElectionSpan]  # In an election while online, in closing order
+    online_open: Dict[int, int]  # uid -> start of online elections never closed
+    wins: List[Tuple[int, int, int]]  # (uid, prev_tick, tick): became leader out of an election
 
 
 @dataclass
@@ -78,6 +227,7 @@ class ValidationResult:
     violations: List[str] = field(default_factory=list)
     warnings: List[str] = field(default_factory=list)  # Expected in async systems
     is_critical: bool = True  # Critical rules vs soft rules
+    overflow: int = 0  # Violations counted past the storage cap
 
     def __str__(self):
         if self.passed:
@@ -93,6 +243,8 @@ class ValidationResult:
                 result += f"\n    - {v}"
             if len(self.violations) > 10:
                 result += f"\n    ... and {len(self.violations) - 10} more"
+            if self.overflow:
+                result += f"\n    ... and {self.overflow} more (not stored)"
         if self.warnings:
             result += "\n  Warnings (expected in async systems):"
             for w in self.warnings[:5]:
@@ -102,73 +254,341 @@ class ValidationResult:
         return result
 
 
+class ViolationLog:
+    """Violations for one rule, storing at most `cap` and counting the rest."""
+
+    def __init__(self, cap: int = MAX_STORED_VIOLATIONS):
+        self.cap = cap
+        self.stored: List[str] = []
+        self.overflow = 0
+
+    def __len__(self):
+        return len(self.stored) + self.overflow
+
+    @property
+    def full(self) -> bool:
+        return len(self.stored) >= self.cap
+
+    def record(self, msg: str):
+        if self.full:
+            self.overflow += 1
+        else:
+            self.stored.append(msg)
+
+
 class BullyValidator:
     def __init__(self, state_log_path: str, message_log_path: str,
                  hb_timeout: int = 3, election_timeout: int = 3):
         self.hb_timeout = hb_timeout
         self.election_timeout = election_timeout
         self.states: Dict[int, List[NodeState]] = {}  # tick -> list of node states
-        self.messages: List[Message] = []
+        self.sorted_ticks: List[int] = []
+        self.message_array: np.ndarray = np.empty(0, dtype=MESSAGE_DTYPE)
         self.metadata: Dict = {}
 
         self._load_state_log(state_log_path)
         self._load_message_log(message_log_path)
+        self._build_state_arrays()
 
     def _load_state_log(self, path: str):
-        with open(path, 'r') as f:
-            for line in f:
-                data = json.loads(line.strip())
-                if data.get('metadata'):
-                    self.metadata = data
-                    continue
-                tick = data['tick']
-                self.states[tick] = [
-                    NodeState(
-                        uid=n['uid'],
-                        online=n['online'],
-                        leader=n['leader'],
-                        election=n['election'],
-                        last_hb=n['last_hb']
-                    )
-                    for n in data['nodes']
-                ]
+        lines = _read_lines(path)
+
+        # The metadata record, when present, is the first line of the log
+        first = next(lines, None)
+        if first is not None:
+            data = _json_loads(first) if b'"metadata"' in first else None
+            if data is not None and data.get('metadata'):
+                self.metadata = data
+            else:
+                lines = chain((first,), lines)
+
+        ticks = []  # in log order
+        for line in lines:
+            record = _decode_tick(line)
+            self.states[record.tick] = record.nodes
+            ticks.append(record.tick)
+
+        # The simulator logs each tick once, in increasing order; only a log
+        # with repeated or out-of-order ticks needs sorting
+        if all(map(lt, ticks, islice(ticks, 1, None))):
+            self.sorted_ticks = ticks
+        else:
+            self.sorted_ticks = sorted(self.states)
 
     def _load_message_log(self, path: str):
-        with open(path, 'r') as f:
-            for line in f:
-                data = json.loads(line.strip())
-                self.messages.append(Message(
-                    tick=data['tick'],
-                    type=data['type'],
-                    src=data['src'],
-                    dst=data['dst'],
-                    dropped=data['dropped'],
-                    direction=data['dir']
-                ))
+        """Decode the message log straight into a MESSAGE_DTYPE array, one
+        row per message in log order."""
+        self.message_array = np.fromiter(map(_message_row, _read_lines(path)), dtype=MESSAGE_DTYPE)
+
+    def _build_state_arrays(self):
+        """Struct-of-arrays copy of the state log, one row per (tick, node).
+
+        Rows are grouped by tick in ascending order: the rows of
+        self.ticks[i] are tick_offsets[i]:tick_offsets[i + 1].
+        """
+        ticks = self.sorted_ticks
+        self.ticks = np.array(ticks, dtype=np.int64)
+        self.tick_offsets = np.zeros(len(ticks) + 1, dtype=np.int64)
+        np.cumsum([len(self.states[t]) for t in ticks], out=self.tick_offsets[1:])
+
+        nodes = chain.from_iterable(map(self.states.__getitem__, ticks))
+        rows = np.fromiter(chain.from_iterable(map(_state_fields, nodes)), dtype=np.int64,
+                           count=5 * int(self.tick_offsets[-1])).reshape(-1, 5)
+        self.state_tick = np.repeat(self.ticks, np.diff(self.tick_offsets))
+        self.state_uid = rows[:, 0].copy()
+        self.state_online = rows[:, 1].astype(bool)
+        self.state_leader = rows[:, 2].copy()
+        self.state_election = rows[:, 3].astype(bool)
+        self.state_last_hb = rows[:, 4].copy()
+
+    def _reduce_by_tick(self, ufunc, values, empty):
+        """Reduce per-row `values` with `ufunc` over each tick's rows.
+
+        Returns one value per entry of self.ticks; ticks without rows get `empty`.
+        """
+        starts = self.tick_offsets[:-1]
+        nonempty = starts < self.tick_offsets[1:]
+        out = np.full(len(starts), empty, dtype=values.dtype)
+        if nonempty.any():
+            out[nonempty] = ufunc.reduceat(values, starts[nonempty])
+        return out
+
+    # Derived views below are computed on first use and shared by the validators
+
+    @cached_property
+    def msgs_by_tick(self) -> Dict[int, List[Message]]:
+        """tick -> messages, in log order, as Message records rebuilt from
+        message_array."""
+        grouped = defaultdict(list)
+        for tick, m_type, src, dst, dropped, direction in self.message_array.tolist():
+            grouped[tick].append(
+                Message(tick, MSG_TYPES[m_type], src, dst, dropped, DIRECTIONS[direction]))
+        return dict(grouped)
+
+    @cached_property
+    def state_by_tick_uid(self) -> Dict[Tuple[int, int], NodeState]:
+        return {(tick, n.uid): n for tick, nodes in self.states.items() for n in nodes}
+
+    @cached_property
+    def online_by_tick(self) -> Dict[int, List[NodeState]]:
+        return {tick: [n for n in nodes if n.online] for tick, nodes in self.states.items()}
+
+    @cached_property
+    def self_leaders_by_tick(self):
+        """Online nodes that believe they are the leader.
+
+        (is_self_leader, counts, top): a mask over the state rows, then per
+        tick the number of such nodes and the highest UID among them (-1 if
+        none).
+        """
+        is_self_leader = self.state_online & (self.state_leader == self.state_uid)
+        counts = self._reduce_by_tick(np.add, is_self_leader.astype(np.int64), 0)
+        top = self._reduce_by_tick(np.maximum, np.where(is_self_leader, self.state_uid, -1), -1)
+        return is_self_leader, counts, top
+
+    @cached_property
+    def online_leader_bounds(self):
+        """Lowest and highest leader view among each tick's online nodes.
+
+        They are equal exactly when the online nodes agree on a leader;
+        ticks with no online node get an empty range (lowest > highest).
+        """
+        online = self.state_online
+        leader = self.state_leader
+        bounds = np.iinfo(leader.dtype)
+        lowest = self._reduce_by_tick(np.minimum, np.where(online, leader, bounds.max), bounds.max)
+        highest = self._reduce_by_tick(np.maximum, np.where(online, leader, bounds.min), bounds.min)
+        return lowest, highest
+
+    @cached_property
+    def election_transitions(self) -> ElectionTransitions:
+        """Election spans and wins of every node, from a single pass over the ticks.
+
+        Each node's state is compared with its state at the previous tick, if
+        it was logged there.
+        """
+        spans = []
+        online_spans = []
+        open_spans = {}  # uid -> start tick
+        online_open = {}  # uid -> start tick
+        wins = []
+        prev = {}  # uid -> state at the previous tick
+        prev_tick = None
+
+        for tick in self.sorted_ticks:
+            curr = {}
+            for n in self.states[tick]:
+                uid = n.uid
+                p = prev.get(uid)
+                was_in_election = p is not None and p.election
+                if n.election and not was_in_election:
+                    open_spans[uid] = tick
+                elif was_in_election and not n.election:
+                    spans.append(ElectionSpan(uid, open_spans.pop(uid), tick))
+
+                if n.election and n.online:
+                    online_open.setdefault(uid, tick)
+                elif uid in online_open:
+                    online_spans.append(ElectionSpan(uid, online_open.pop(uid), tick))
+
+                # Was in an election, now believes itself leader
+                if was_in_election and n.leader == uid and n.online and p.leader != uid:
+                    wins.append((uid, prev_tick, tick))
+                curr[uid] = n
+            prev = curr
+            prev_tick = tick
+        return ElectionTransitions(spans, online_spans, online_open, wins)
+
+    @cached_property
+    def election_end_ticks(self) -> List[int]:
+        """Closing ticks of all election spans, in order."""
+        return sorted(span.end for span in self.election_transitions.spans)
+
+    @cached_property
+    def any_election_tick(self):
+        """Bool array indexed by tick: was an online node in an election?"""
+        active = self._reduce_by_tick(np.logical_or, self.state_online & self.state_election, False)
+        any_election = np.zeros(int(self.ticks[-1]) + 1 if len(self.ticks) else 0, dtype=bool)
+        any_election[self.ticks] = active
+        return any_election
+
+    @cached_property
+    def election_tick_counts(self):
+        """Running count of any_election_tick: entry t counts the ticks
+        before t with election activity, so any window is one subtraction."""
+        counts = np.zeros(len(self.any_election_tick) + 1, dtype=np.int64)
+        np.cumsum(self.any_election_tick, out=counts[1:])
+        return counts
+
+    @cached_property
+    def node_matrices(self):
+        """Node-by-tick views of the state log.
+
+        (uids, present, online, election): the distinct node UIDs in
+        ascending order, then bool matrices with one row per UID and one
+        column per entry of self.ticks. `present` marks the nodes logged at
+        each tick.
+        """
+        uids, rows = np.unique(self.state_uid, return_inverse=True)
+        columns = np.repeat(np.arange(len(self.ticks)), np.diff(self.tick_offsets))
+        shape = (len(uids), len(self.ticks))
+
+        present = np.zeros(shape, dtype=bool)
+        online = np.zeros(shape, dtype=bool)
+        election = np.zeros(shape, dtype=bool)
+        present[rows, columns] = True
+        online[rows, columns] = self.state_online
+        election[rows, columns] = self.state_election
+        return uids, present, online, election
+
+    @cached_property
+    def online_changes_by_tick(self) -> Dict[int, List[Tuple[int, Optional[bool], bool]]]:
+        """tick -> (uid, was_online, is_online) of each node whose online status
+        differs from the previous logged tick, in UID order.
+
+        Nodes missing from a tick count as offline; was_online is None when
+        the node was not logged at the previous tick. Ticks without changes
+        are left out.
+        """
+        uids, present, online, _ = self.node_matrices
+        ticks = self.sorted_ticks
+        # Transposed so that changes come out tick by tick
+        columns, rows = np.nonzero((online[:, :-1] != online[:, 1:]).T)
+
+        changes = defaultdict(list)
+        for i, row in zip(columns.tolist(), rows.tolist()):
+            was_online = bool(online[row, i]) if present[row, i] else None
+            changes[ticks[i + 1]].append((int(uids[row]), was_online, not was_online))
+        return dict(changes)
+
+    def _select_messages(self, msg_type: MsgType, direction: Direction,
+                         delivered: bool = False) -> np.ndarray:
+        """Rows of message_array with this type and direction, and not
+        dropped if `delivered`.
+
+        Rows are grouped by tick, ticks in the order of their first such
+        message and rows in log order within a tick.
+        """
+        msgs = self.message_array
+        mask = (msgs['type'] == _TYPE_CODES[msg_type]) & (msgs['dir'] == _DIRECTION_CODES[direction])
+        if delivered:
+            mask &= ~msgs['dropped']
+        rows = msgs[mask]
+        _, first, group = np.unique(rows['tick'], return_index=True, return_inverse=True)
+        rank = np.empty_like(first)
+        rank[np.argsort(first)] = np.arange(len(first))
+        return rows[np.argsort(rank[group], kind='stable')]
+
+    def _sent_ticks(self, msg_type: MsgType, *fields: str) -> Dict:
+        """Values of `fields` (a tuple if more than one) -> sorted int32 array
+        of the ticks at which a `msg_type` with them was sent and not dropped."""
+        sent = self._select_messages(msg_type, Direction.SEND, delivered=True)
+        columns = [sent[f].tolist() for f in fields]
+        keys = zip(*columns) if len(columns) > 1 else columns[0]
+        ticks = defaultdict(set)
+        for key, tick in zip(keys, sent['tick'].tolist()):
+            ticks[key].add(tick)
+        return {k: np.array(sorted(v), dtype=np.int32) for k, v in ticks.items()}
+
+    @cached_property
+    def elections_sent(self) -> np.ndarray:
+        """ELECTION messages sent and not dropped, grouped by tick."""
+        return self._select_messages(MsgType.ELECTION, Direction.SEND, delivered=True)
+
+    @cached_property
+    def elections_recv(self) -> np.ndarray:
+        """ELECTION messages received, grouped by tick."""
+        return self._select_messages(MsgType.ELECTION, Direction.RECV)
+
+    @cached_property
+    def oks_sent_by_src_dst(self) -> Dict[Tuple[int, int], np.ndarray]:
+        """(src, dst) -> sorted int32 array of ticks at which src sent dst an OK."""
+        return self._sent_ticks(MsgType.OK, 'src', 'dst')
+
+    @cached_property
+    def coord_sent_by_uid_tick(self) -> Dict[int, np.ndarray]:
+        """uid -> sorted int32 array of ticks at which it sent a COORDINATOR."""
+        return self._sent_ticks(MsgType.COORDINATOR, 'src')
+
+    @cached_property
+    def has_hb(self) -> np.ndarray:
+        """Bool matrix indexed by [uid, tick]: did the node send a HEARTBEAT
+        there that was not dropped? Spans every UID and tick in either log."""
+        msgs = self.message_array
+        hbs = msgs[(msgs['type'] == _TYPE_CODES[MsgType.HEARTBEAT])
+                   & (msgs['dir'] == _DIRECTION_CODES[Direction.SEND])
+                   & ~msgs['dropped'] & (msgs['tick'] >= 0) & (msgs['src'] >= 0)]
+        num_uids = max(int(self.state_uid.max()) if len(self.state_uid) else -1,
+                       int(hbs['src'].max()) if len(hbs) else -1) + 1
+        num_ticks = max(int(self.ticks[-1]) if len(self.ticks) else 0,
+                        int(hbs['tick'].max()) if len(hbs) else 0) + 2
+        has_hb = np.zeros((num_uids, num_ticks), dtype=bool)
+        has_hb[hbs['src'], hbs['tick']] = True
+        return has_hb
 
     def get_online_nodes(self, tick: int) -> List[NodeState]:
         """Get all online nodes at a given tick."""
-        if tick not in self.states:
-            return []
-        return [n for n in self.states[tick] if n.online]
+        return self.online_by_tick.get(tick, [])
 
     def get_node_state(self, tick: int, uid: int) -> Optional[NodeState]:
         """Get a specific node's state at a given tick."""
-        if tick not in self.states:
-            return None
-        for n in self.states[tick]:
-            if n.uid == uid:
-                return n
-        return None
+        return self.state_by_tick_uid.get((tick, uid))
 
     def get_messages_at_tick(self, tick: int, msg_type: str = None,
                              direction: str = None) -> List[Message]:
-        """Get messages at a specific tick, optionally filtered."""
-        result = [m for m in self.messages if m.tick == tick]
+        """Get messages at a specific tick, optionally filtered.
+
+        `msg_type` and `direction` may be given as their log names.
+        """
+        if msg_type:
+            msg_type = MsgType(msg_type)
+        if direction:
+            direction = Direction(direction)
+        result = self.msgs_by_tick.get(tick, [])
         if msg_type:
-            result = [m for m in result if m.type == msg_type]
+            result = [m for m in result if m.type is msg_type]
         if direction:
-            result = [m for m in result if m.direction == direction]
+            result = [m for m in result if m.direction is direction]
         return result
 
     def validate_r1_leader_uniqueness(self) -> ValidationResult:
@@ -180,101 +600,97 @@ class BullyValidator:
         - A higher-UID node recovering will become leader (Bully property)
         We track these as warnings, errors only if overlap persists.
         """
-        violations = []
+        violations = ViolationLog()
         warnings = []
 
-        ticks = sorted(self.states.keys())
+        ticks = self.sorted_ticks
 
-        # Track when nodes recovered (transition from offline to online)
+        # Track when nodes recovered (transition from offline to online
+        # between consecutive ticks); the last recovery of each node is kept
         recovery_ticks = {}  # uid -> tick when recovered
-        for i in range(1, len(ticks)):
-            prev_tick = ticks[i - 1]
-            curr_tick = ticks[i]
-            for node in self.states[curr_tick]:
-                prev_node = self.get_node_state(prev_tick, node.uid)
-                if prev_node and not prev_node.online and node.online:
-                    recovery_ticks[node.uid] = curr_tick
+        for tick, changes in self.online_changes_by_tick.items():
+            for uid, was_online, _ in changes:
+                if was_online is False:
+                    recovery_ticks[uid] = tick
 
         grace_period = self.hb_timeout + 2  # Recovery grace period
 
-        for tick, nodes in self.states.items():
-            online_nodes = [n for n in nodes if n.online]
-            self_leaders = [n for n in online_nodes if n.leader == n.uid]
+        # Self-declared leaders, found over the whole log at once
+        is_self_leader, counts, _ = self.self_leaders_by_tick
+        offsets = self.tick_offsets
 
-            if len(self_leaders) > 1:
-                leader_uids = [n.uid for n in self_leaders]
-                any_in_election = any(n.election for n in online_nodes)
+        for i in np.flatnonzero(counts > 1).tolist():
+            tick = ticks[i]
+            lo, hi = offsets[i], offsets[i + 1]
+            leader_uids = self.state_uid[lo:hi][is_self_leader[lo:hi]].tolist()
+            any_in_election = self.any_election_tick[tick]
 
-                # Check if any of the self-leaders just recovered
-                any_just_recovered = any(
-                    uid in recovery_ticks and tick - recovery_ticks[uid] <= grace_period
-                    for uid in leader_uids
-                )
+            # Check if any of the self-leaders just recovered
+            any_just_recovered = any(
+                uid in recovery_ticks and tick - recovery_ticks[uid] <= grace_period
+                for uid in leader_uids
+            )
 
-                # Check if there was recent election activity
-                recent_election = False
-                for check_tick in range(max(0, tick - grace_period), tick):
-                    if check_tick in self.states:
-                        if any(n.election for n in self.states[check_tick] if n.online):
-                            recent_election = True
-                            break
-
-                msg = f"Tick {tick}: Multiple nodes claim leadership: {leader_uids}"
-
-                if any_in_election:
-                    warnings.append(msg + " (during election)")
-                elif any_just_recovered:
-                    warnings.append(msg + " (node recently recovered)")
-                elif recent_election:
-                    warnings.append(msg + " (post-election grace period)")
-                else:
-                    violations.append(msg)
+            # Check if there was recent election activity
+            election_counts = self.election_tick_counts
+            recent_election = election_counts[tick] > election_counts[max(0, tick - grace_period)]
+
+            msg = f"Tick {tick}: Multiple nodes claim leadership: {leader_uids}"
+
+            if any_in_election:
+                warnings.append(msg + " (during election)")
+            elif any_just_recovered:
+                warnings.append(msg + " (node recently recovered)")
+            elif recent_election:
+                warnings.append(msg + " (post-election grace period)")
+            else:
+                violations.record(msg)
 
         return ValidationResult(
             rule="R1: Leader Uniqueness",
             passed=len(violations) == 0,
-            violations=violations,
+            violations=violations.stored,
+            overflow=violations.overflow,
             warnings=warnings
         )
 
     def validate_r2_leader_consistency(self) -> ValidationResult:
         """R2: After stability period, all online nodes should agree on leader."""
-        violations = []
+        violations = ViolationLog()
         stability_window = self.hb_timeout + self.election_timeout + 2
 
         # Find periods of stability (no failures/recoveries)
-        ticks = sorted(self.states.keys())
+        ticks = self.sorted_ticks
+        online_changes = self.online_changes_by_tick
+
+        # Online nodes disagree when their leader views span more than one value
+        lowest, highest = self.online_leader_bounds
+        disagree = (lowest < highest).tolist()
+
+        # The window [i - stability_window, i) is stable when no online status
+        # changed from j to j + 1 within it (a missing tick counts as a change),
+        # i.e. the last change lies more than stability_window positions back
+        last_change = -stability_window - 1
 
         for i, tick in enumerate(ticks):
-            if i < stability_window:
-                continue
+            if i >= stability_window and i - last_change > stability_window and disagree[i]:
+                if violations.full:
+                    violations.overflow += 1  # Not stored, so skip building the message
+                else:
+                    online_nodes = self.get_online_nodes(tick)
+                    violations.record(
+                        f"Tick {tick}: After {stability_window} stable ticks, "
+                        f"nodes disagree on leader: {dict((n.uid, n.leader) for n in online_nodes)}"
+                    )
 
-            # Check if no online status changes in the stability window
-            stable = True
-            for j in range(i - stability_window, i):
-                if j not in self.states or (j + 1) not in self.states:
-                    stable = False
-                    break
-                prev_online = {n.uid for n in self.states[j] if n.online}
-                curr_online = {n.uid for n in self.states[j + 1] if n.online}
-                if prev_online != curr_online:
-                    stable = False
-                    break
-
-            if stable:
-                online_nodes = [n for n in self.states[tick] if n.online]
-                if len(online_nodes) > 1:
-                    leaders = set(n.leader for n in online_nodes)
-                    if len(leaders) > 1:
-                        violations.append(
-                            f"Tick {tick}: After {stability_window} stable ticks, "
-                            f"nodes disagree on leader: {dict((n.uid, n.leader) for n in online_nodes)}"
-                        )
+            if i not in self.states or i + 1 not in self.states or i + 1 in online_changes:
+                last_change = i
 
         return ValidationResult(
             rule="R2: Leader Consistency (after stability)",
             passed=len(violations) == 0,
-            violations=violations
+            violations=violations.stored,
+            overflow=violations.overflow
         )
 
     def validate_r3_leader_maximality(self) -> ValidationResult:
@@ -284,57 +700,49 @@ class BullyValidator:
         agree on a lower-UID leader before the higher-UID node's COORDINATOR
         arrives. We give a grace period after any election activity.
         """
-        violations = []
+        violations = ViolationLog()
         warnings = []
 
-        ticks = sorted(self.states.keys())
-        election_end_ticks = {}  # uid -> tick when election ended
-
-        # Track when elections end
-        for i, tick in enumerate(ticks):
-            for node in self.states[tick]:
-                if i > 0:
-                    prev_node = self.get_node_state(ticks[i-1], node.uid)
-                    if prev_node and prev_node.election and not node.election:
-                        election_end_ticks[node.uid] = tick
-
-        for tick, nodes in self.states.items():
-            online_nodes = [n for n in nodes if n.online]
-            if len(online_nodes) == 0:
-                continue
-
-            # Skip if any node is in election
-            if any(n.election for n in online_nodes):
-                continue
+        ticks = self.sorted_ticks
+        end_ticks = self.election_end_ticks
+
+        # Evaluated for every tick at once: the online nodes agree on a leader
+        # (their lowest and highest views match), that leader is online, no
+        # online node is in an election, and the leader is not the highest
+        # online UID. Only the ticks that fail are visited below.
+        online = self.state_online
+        uid = self.state_uid
+        lowest, highest = self.online_leader_bounds
+        agreed = lowest
+        leader_online = self._reduce_by_tick(
+            np.logical_or, online & (uid == np.repeat(agreed, np.diff(self.tick_offsets))), False)
+        max_online_uids = self._reduce_by_tick(
+            np.maximum, np.where(online, uid, np.iinfo(uid.dtype).min), np.iinfo(uid.dtype).min)
+        in_election = self.any_election_tick[self.ticks]
+
+        not_max = (lowest == highest) & leader_online & ~in_election & (agreed != max_online_uids)
+
+        for i in np.flatnonzero(not_max).tolist():
+            tick = ticks[i]
+            agreed_leader = int(agreed[i])
+            max_online_uid = int(max_online_uids[i])
 
             # Check if we're in grace period after election
             grace_period = self.election_timeout + 2
-            in_grace = any(
-                tick - end_tick <= grace_period
-                for uid, end_tick in election_end_ticks.items()
-            )
-
-            # Check if all online nodes agree on a leader
-            leaders = set(n.leader for n in online_nodes)
-            if len(leaders) == 1:
-                agreed_leader = leaders.pop()
-                max_online_uid = max(n.uid for n in online_nodes)
+            in_grace = bisect_left(end_ticks, tick - grace_period) < len(end_ticks)
 
-                # The agreed leader must be online
-                leader_node = next((n for n in online_nodes if n.uid == agreed_leader), None)
-
-                if leader_node and agreed_leader != max_online_uid:
-                    msg = (f"Tick {tick}: Agreed leader {agreed_leader} is not max "
-                           f"online UID {max_online_uid}")
-                    if in_grace:
-                        warnings.append(msg + " (in post-election grace period)")
-                    else:
-                        violations.append(msg)
+            msg = (f"Tick {tick}: Agreed leader {agreed_leader} is not max "
+                   f"online UID {max_online_uid}")
+            if in_grace:
+                warnings.append(msg + " (in post-election grace period)")
+            else:
+                violations.record(msg)
 
         return ValidationResult(
             rule="R3: Leader Maximality",
             passed=len(violations) == 0,
-            violations=violations,
+            violations=violations.stored,
+            overflow=violations.overflow,
             warnings=warnings
         )
 
@@ -346,91 +754,67 @@ class BullyValidator:
         - The destination may go offline between receiving and responding
         - MPI message delivery timing varies
         """
-        violations = []
+        violations = ViolationLog()
         warnings = []
 
-        # Group messages by tick - track both sends and receives
-        elections_sent = defaultdict(list)
-        elections_recv = defaultdict(list)
-        oks_sent = defaultdict(list)
-
-        for m in self.messages:
-            if m.type == 'ELECTION':
-                if m.direction == 'send' and not m.dropped:
-                    elections_sent[m.tick].append(m)
-                elif m.direction == 'recv':
-                    elections_recv[m.tick].append(m)
-            elif m.type == 'OK' and m.direction == 'send' and not m.dropped:
-                oks_sent[m.tick].append(m)
+        # Messages grouped by tick - track both sends and receives
+        elections_sent = self.elections_sent
+        elections_recv = self.elections_recv
+        oks_sent = self.oks_sent_by_src_dst  # (src, dst) -> sorted ticks
+        no_oks = np.empty(0, dtype=np.int32)
 
         # For each ELECTION received, check if OK was sent back
-        for tick, elections in elections_recv.items():
-            for election in elections:
-                src = election.src  # Who sent the election
-                dst = election.dst  # Who received it (should be the receiver node)
-
-                # The receiver is actually the src_uid if we're looking at receive events
-                # Actually, for recv events, src_uid is still the original sender
-                receiver_uid = dst if dst != -1 else None
-
-                # Skip if we can't determine receiver (broadcast to -1)
-                if receiver_uid is None:
-                    continue
-
-                # Check if receiver was online at this tick
-                receiver_state = self.get_node_state(tick, receiver_uid)
-                if receiver_state is None or not receiver_state.online:
-                    continue
-
-                # Check for OK response from receiver to sender
-                ok_found = False
-                for check_tick in range(tick, tick + 3):
-                    for ok in oks_sent.get(check_tick, []):
-                        if ok.src == receiver_uid and ok.dst == src:
-                            ok_found = True
-                            break
-                    if ok_found:
-                        break
-
-                if not ok_found:
-                    # This could be due to timing - log as warning
-                    warnings.append(
-                        f"Tick {tick}: Node {receiver_uid} received ELECTION from "
-                        f"{src} but no OK sent found"
-                    )
+        for tick, src, dst in zip(elections_recv['tick'].tolist(), elections_recv['src'].tolist(),
+                                  elections_recv['dst'].tolist()):
+            # src: who sent the election
+            # dst: who received it (should be the receiver node)
+
+            # The receiver is actually the src_uid if we're looking at receive events
+            # Actually, for recv events, src_uid is still the original sender
+            receiver_uid = dst if dst != -1 else None
+
+            # Skip if we can't determine receiver (broadcast to -1)
+            if receiver_uid is None:
+                continue
+
+            # Check if receiver was online at this tick
+            receiver_state = self.get_node_state(tick, receiver_uid)
+            if receiver_state is None or not receiver_state.online:
+                continue
+
+            # Check for OK response from receiver to sender
+            ok_found = _any_between(oks_sent.get((receiver_uid, src), no_oks), tick, tick + 2)
+
+            if not ok_found:
+                # This could be due to timing - log as warning
+                warnings.append(
+                    f"Tick {tick}: Node {receiver_uid} received ELECTION from "
+                    f"{src} but no OK sent found"
+                )
 
         # Original check based on sent elections (more strict)
-        for tick, elections in elections_sent.items():
-            for election in elections:
-                src = election.src
-                dst = election.dst
-
-                if dst == -1:  # Skip broadcasts
-                    continue
-
-                dst_state = self.get_node_state(tick, dst)
-                if dst_state is None or not dst_state.online:
-                    continue
-
-                ok_found = False
-                for check_tick in range(tick, tick + 3):
-                    for ok in oks_sent.get(check_tick, []):
-                        if ok.src == dst and ok.dst == src:
-                            ok_found = True
-                            break
-                    if ok_found:
-                        break
-
-                if not ok_found:
-                    violations.append(
-                        f"Tick {tick}: Node {dst} (online) did not send OK to "
-                        f"node {src}'s ELECTION"
-                    )
+        for tick, src, dst in zip(elections_sent['tick'].tolist(), elections_sent['src'].tolist(),
+                                  elections_sent['dst'].tolist()):
+            if dst == -1:  # Skip broadcasts
+                continue
+
+            dst_state = self.get_node_state(tick, dst)
+            if dst_state is None or not dst_state.online:
+                continue
+
+            ok_found = _any_between(oks_sent.get((dst, src), no_oks), tick, tick + 2)
+
+            if not ok_found:
+                violations.record(
+                    f"Tick {tick}: Node {dst} (online) did not send OK to "
+                    f"node {src}'s ELECTION"
+                )
 
         return ValidationResult(
             rule="R4: OK Response to ELECTION",
             passed=len(violations) == 0,
-            violations=violations,
+            violations=violations.stored,
+            overflow=violations.overflow,
             warnings=warnings,
             is_critical=False  # Soft rule - async timing can cause misses
         )
@@ -449,55 +833,19 @@ class BullyValidator:
         warnings = []
 
         # First, collect all COORDINATOR broadcasts by source
-        coord_broadcasts = defaultdict(set)  # uid -> set of ticks when they broadcast
-        for m in self.messages:
-            if m.type == 'COORDINATOR' and m.direction == 'send' and not m.dropped:
-                coord_broadcasts[m.src].add(m.tick)
-
-        # Track nodes that WIN elections (transition from election to leader)
-        ticks = sorted(self.states.keys())
-        checked_transitions = set()  # (uid, tick) pairs we've checked
-
-        for i in range(1, len(ticks)):
-            prev_tick = ticks[i - 1]
-            curr_tick = ticks[i]
-
-            for node in self.states[curr_tick]:
-                prev_node = self.get_node_state(prev_tick, node.uid)
-                if prev_node is None:
-                    continue
-
-                # Detect election win: was in election, now believes self is leader
-                was_in_election = prev_node.election
-                now_self_leader = node.leader == node.uid and node.online
-                was_not_self_leader = prev_node.leader != node.uid
-
-                if was_in_election and now_self_leader and was_not_self_leader:
-                    # This node won an election
-                    transition_key = (node.uid, curr_tick)
-                    if transition_key in checked_transitions:
-                        continue
-                    checked_transitions.add(transition_key)
-
-                    # Check for COORDINATOR in a window around this tick
-                    coord_found = False
-                    for check_tick in range(prev_tick, curr_tick + 3):
-                        if check_tick in coord_broadcasts[node.uid]:
-                            coord_found = True
-                            break
-
-                    if not coord_found:
-                        # Double check - maybe it was sent slightly earlier
-                        for check_tick in range(max(0, prev_tick - 2), prev_tick):
-                            if check_tick in coord_broadcasts[node.uid]:
-                                coord_found = True
-                                break
-
-                    if not coord_found:
-                        warnings.append(
-                            f"Tick {curr_tick}: Node {node.uid} won election but "
-                            f"no nearby COORDINATOR broadcast found"
-                        )
+        coord_broadcasts = self.coord_sent_by_uid_tick  # uid -> sorted ticks when they broadcast
+        no_broadcasts = np.empty(0, dtype=np.int32)
+
+        # Nodes that WIN elections (transition from election to leader)
+        for uid, prev_tick, curr_tick in dict.fromkeys(self.election_transitions.wins):
+            # Check for COORDINATOR in a window around this tick,
+            # allowing it to have been sent slightly earlier
+            sent = coord_broadcasts.get(uid, no_broadcasts)
+            if not _any_between(sent, max(0, prev_tick - 2), curr_tick + 2):
+                warnings.append(
+                    f"Tick {curr_tick}: Node {uid} won election but "
+                    f"no nearby COORDINATOR broadcast found"
+                )
 
         return ValidationResult(
             rule="R5: COORDINATOR Broadcast",
@@ -509,22 +857,20 @@ class BullyValidator:
 
     def validate_r7_heartbeat_protocol(self) -> ValidationResult:
         """R7: Leader must send HEARTBEAT regularly."""
-        violations = []
+        violations = ViolationLog()
+
+        # Who believes they are leader, per tick
+        _, counts, top = self.self_leaders_by_tick
 
         # Find consecutive ticks where a node is leader and online
-        ticks = sorted(self.states.keys())
+        ticks = self.sorted_ticks
         leader_streaks = defaultdict(list)  # uid -> list of consecutive leader ticks
 
         current_leader = None
         streak_start = None
 
-        for tick in ticks:
-            online_nodes = self.get_online_nodes(tick)
-            # Find who believes they are leader
-            self_leaders = [n for n in online_nodes if n.leader == n.uid]
-
-            if len(self_leaders) == 1:
-                leader = self_leaders[0].uid
+        for tick, count, leader in zip(ticks, counts.tolist(), top.tolist()):
+            if count == 1:
                 if leader == current_leader:
                     continue  # Streak continues
                 else:
@@ -541,61 +887,45 @@ class BullyValidator:
                 streak_start = None
 
         # Check heartbeats during leader streaks
-        hb_by_tick = defaultdict(list)
-        for m in self.messages:
-            if m.type == 'HEARTBEAT' and m.direction == 'send' and not m.dropped:
-                hb_by_tick[m.tick].append(m)
+        has_hb = self.has_hb
 
         for uid, streaks in leader_streaks.items():
             for start, end in streaks:
                 if end - start < 3:
                     continue  # Too short to meaningfully check
 
-                for tick in range(start + 1, end):
-                    hbs = [h for h in hb_by_tick.get(tick, []) if h.src == uid]
-                    if not hbs:
-                        # Check if heartbeat was sent recently
-                        recent_hb = False
-                        for check_tick in range(tick - 1, tick + 1):
-                            if any(h.src == uid for h in hb_by_tick.get(check_tick, [])):
-                                recent_hb = True
-                                break
-
-                        if not recent_hb:
-                            violations.append(
-                                f"Tick {tick}: Leader {uid} did not send HEARTBEAT"
-                            )
+                # Heartbeats sent at each tick or the tick before
+                if 0 <= uid < len(has_hb):
+                    sent = has_hb[uid, start:end - 1] | has_hb[uid, start + 1:end]
+                else:
+                    sent = np.zeros(end - start - 1, dtype=bool)
+                for tick in (start + 1 + np.flatnonzero(~sent)).tolist():
+                    violations.record(
+                        f"Tick {tick}: Leader {uid} did not send HEARTBEAT"
+                    )
 
         return ValidationResult(
             rule="R7: Heartbeat Protocol",
             passed=len(violations) == 0,
-            violations=violations
+            violations=violations.stored,
+            overflow=violations.overflow
         )
 
     def validate_r8_election_termination(self) -> ValidationResult:
         """R8: Elections must eventually terminate."""
-        violations = []
+        violations = ViolationLog()
         max_election_duration = self.election_timeout + 5  # Some buffer
 
-        # Track election periods per node
-        ticks = sorted(self.states.keys())
+        # Election periods per node, while it was online
+        transitions = self.election_transitions
         node_elections = defaultdict(list)  # uid -> list of (start_tick, end_tick)
-
-        active_elections = {}  # uid -> start_tick
-
-        for tick in ticks:
-            for node in self.states[tick]:
-                if node.election and node.online:
-                    if node.uid not in active_elections:
-                        active_elections[node.uid] = tick
-                else:
-                    if node.uid in active_elections:
-                        start = active_elections.pop(node.uid)
-                        node_elections[node.uid].append((start, tick))
+        for uid, start, end in transitions.online_spans:
+            node_elections[uid].append((start, end))
+        active_elections = transitions.online_open  # uid -> start_tick
 
         # Check for unterminated elections
         for uid, start_tick in active_elections.items():
-            violations.append(
+            violations.record(
                 f"Node {uid}: Election started at tick {start_tick} never terminated"
             )
 
@@ -604,7 +934,7 @@ class BullyValidator:
             for start, end in elections:
                 duration = end - start
                 if duration > max_election_duration:
-                    violations.append(
+                    violations.record(
                         f"Node {uid}: Election from tick {start} to {end} "
                         f"took {duration} ticks (max expected: {max_election_duration})"
                     )
@@ -612,20 +942,40 @@ class BullyValidator:
         return ValidationResult(
             rule="R8: Election Termination",
             passed=len(violations) == 0,
-            violations=violations
+            violations=violations.stored,
+            overflow=violations.overflow
         )
 
+    # Derived views the rules read; built before the rules start so that
+    # concurrent rules never race to compute one
+    _SHARED_VIEWS = (
+        'state_by_tick_uid', 'online_by_tick', 'self_leaders_by_tick',
+        'online_leader_bounds', 'election_transitions', 'election_end_ticks', 'any_election_tick',
+        'election_tick_counts', 'node_matrices', 'online_changes_by_tick',
+        'elections_sent', 'elections_recv', 'oks_sent_by_src_dst',
+        'coord_sent_by_uid_tick', 'has_hb',
+    )
+
     def validate_all(self) -> List[ValidationResult]:
-        """Run all validation rules."""
-        return [
-            self.validate_r1_leader_uniqueness(),
-            self.validate_r2_leader_consistency(),
-            self.validate_r3_leader_maximality(),
-            self.validate_r4_ok_response(),
-            self.validate_r5_coordinator_broadcast(),
-            self.validate_r7_heartbeat_protocol(),
-            self.validate_r8_election_termination(),
+        """Run all validation rules.
+
+        The rules only read the logs and the shared views, so they run
+        concurrently; results keep the rule order.
+        """
+        for name in self._SHARED_VIEWS:
+            getattr(self, name)
+
+        rules = [
+            self.validate_r1_leader_uniqueness,
+            self.validate_r2_leader_consistency,
+            self.validate_r3_leader_maximality,
+            self.validate_r4_ok_response,
+            self.validate_r5_coordinator_broadcast,
+            self.validate_r7_heartbeat_protocol,
+            self.validate_r8_election_termination,
         ]
+        with ThreadPoolExecutor(max_workers=min(len(rules), os.cpu_count() or 1)) as pool:
+            return list(pool.map(lambda rule: rule(), rules))
 
     def print_summary(self):
         """Print a summary of the simulation."""
@@ -639,29 +989,26 @@ class BullyValidator:
             print(f"Seed: {self.metadata.get('seed', 'N/A')}")
 
         # Count message types
-        msg_counts = defaultdict(int)
-        for m in self.messages:
-            if m.direction == 'send':
-                msg_counts[m.type] += 1
+        msgs = self.message_array
+        sent_types = msgs['type'][msgs['dir'] == _DIRECTION_CODES[Direction.SEND]]
+        counts = np.bincount(sent_types, minlength=len(MSG_TYPES))
+        msg_counts = {t.value: c for t, c in zip(MSG_TYPES, counts.tolist()) if c}
 
         print(f"\nMessage counts (sent):")
         for msg_type, count in sorted(msg_counts.items()):
             print(f"  {msg_type}: {count}")
 
         # Count elections
-        ticks_with_elections = sum(
-            1 for tick, nodes in self.states.items()
-            if any(n.election for n in nodes if n.online)
-        )
+        ticks_with_elections = np.count_nonzero(self._reduce_by_tick(
+            np.logical_or, self.state_online & self.state_election, False))
         print(f"\nTicks with active elections: {ticks_with_elections}")
 
         # Count leader changes
         leader_changes = 0
         prev_leader = None
-        for tick in sorted(self.states.keys()):
-            online = self.get_online_nodes(tick)
-            self_leaders = [n for n in online if n.leader == n.uid]
-            curr_leader = self_leaders[0].uid if len(self_leaders) == 1 else None
+        _, counts, top = self.self_leaders_by_tick
+        for count, leader in zip(counts.tolist(), top.tolist()):
+            curr_leader = leader if count == 1 else None
             if prev_leader is not None and curr_leader != prev_leader:
                 leader_changes += 1
             prev_leader = curr_leader
@@ -710,7 +1057,7 @@ def main():
     except FileNotFoundError as e:
         print(f"Error: Could not find log file: {e}")
         return 1
-    except json.JSONDecodeError as e:
+    except (ValueError, _DecodeError) as e:  # JSONDecodeError is a ValueError
         print(f"Error: Invalid JSON in log file: {e}")
         return 1
 
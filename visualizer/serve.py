@@ -5,19 +5,81 @@ Simple HTTP server for the Bully Election Visualizer.
 Usage:
     python serve.py --state path/to/state_log.jsonl --msg path/to/message_log.jsonl --debug path/to/debug_log.jsonl [--port PORT]
 
-If log files are provided, they will be copied to the visualizer directory
-and automatically loaded when the page opens.
+If log files are provided, they are hard-linked into the visualizer
+directory (or symlinked, or copied where linking is not possible) and
+automatically loaded when the page opens. With --in-place they are served
+from where they are instead.
+
+Files are served from an aiohttp event loop when aiohttp is installed, and
+by the standard library's http.server otherwise.
 """
 
+import email.utils
+import functools
 import http.server
-import socketserver
+import io
+from http import HTTPStatus
+import socket
+import threading
 import os
 import shutil
 import argparse
 import webbrowser
 import json
+import zlib
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
 
+# aiohttp serves every asset from one asyncio event loop; fall back to the
+# blocking stdlib server when it is not installed
+try:
+    from aiohttp import web
+except ImportError:
+    web = None
+
+# orjson parses log lines and serializes the autoload config considerably
+# faster; fall back to stdlib json with the same compact output
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+# zstandard compresses streamed logs faster than gzip for clients that
+# accept zstd
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# JSONL logs are streamed in chunks of about this many bytes, each extended
+# to the end of its last line
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Kernel send/receive buffer size for the stdlib server's sockets
+SOCKET_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Connections the stdlib server handles at once, one thread each
+MAX_CONNECTIONS = 64
+
+# Seconds an idle keep-alive connection is held open (and its thread kept)
+KEEPALIVE_TIMEOUT = 15
+
+_BYTE_RANGE = re.compile(r'bytes=(\d*)-(\d*)')
+
+# Log indexes from earlier runs, reused while the logs are unchanged
+INDEX_CACHE_FILE = 'autoload.json.cache'
+
+# Compression levels for streamed JSONL logs
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
 def parse_args():
     parser = argparse.ArgumentParser(
         description='Serve the Bully Election Visualizer with optional log files'
@@ -43,6 +105,24 @@ def parse_args():
         default=8080,
         help='Port to serve on (default: 8080)'
     )
+    parser.add_argument(
+        '--bind', '-b',
+        default='127.0.0.1',
+        help='Address to serve on (default: 127.0.0.1; use :: for all '
+             'IPv4 and IPv6 interfaces)'
+    )
+    parser.add_argument(
+        '--index',
+        action='store_true',
+        help='Index the logs by tick in autoload.json (scans every log line '
+             'at startup)'
+    )
+    parser.add_argument(
+        '--in-place',
+        action='store_true',
+        help='Serve the log files from where they are instead of linking '
+             'or copying them into the visualizer directory'
+    )
     parser.add_argument(
         '--no-browser',
         action='store_true',
@@ -50,67 +130,479 @@ def parse_args():
     )
     return parser.parse_args()
 
-def copy_log_files(state_log, message_log, debug_log, dest_dir):
-    """Copy log files to the visualizer directory."""
-    copied = []
-
-    if state_log:
-        state_path = Path(state_log)
-        if state_path.exists():
-            dest = dest_dir / 'state_log.jsonl'
-            shutil.copy(state_path, dest)
-            copied.append(('state', state_path))
-            print(f"Copied state log: {state_path} -> {dest}")
-        else:
-            print(f"Warning: State log not found: {state_log}")
-
-    if message_log:
-        msg_path = Path(message_log)
-        if msg_path.exists():
-            dest = dest_dir / 'message_log.jsonl'
-            shutil.copy(msg_path, dest)
-            copied.append(('message', msg_path))
-            print(f"Copied message log: {msg_path} -> {dest}")
-        else:
-            print(f"Warning: Message log not found: {message_log}")
-
-    if debug_log:
-        debug_path = Path(debug_log)
-        if debug_path.exists():
-            dest = dest_dir / 'debug_log.jsonl'
-            shutil.copy(debug_path, dest)
-            copied.append(('debug', debug_path))
-            print(f"Copied debug log: {debug_path} -> {dest}")
-        else:
-            print(f"Warning: Debug log not found: {debug_log}")
+def _link_or_copy(src, dest):
+    """Make dest a hard link to src, else a symlink, else a copy.
 
+    Returns how it was placed, for the log output.
+    """
+    if dest.exists() and os.path.samefile(src, dest):
+        return 'Kept'  # Already serving this file
+    dest.unlink(missing_ok=True)
+    try:
+        os.link(src, dest)
+        return 'Linked'
+    except OSError:
+        pass
+    try:
+        os.symlink(src.resolve(), dest)
+        return 'Symlinked'
+    except OSError:
+        shutil.copyfile(src, dest)  # Uses sendfile(2) where available
+        return 'Copied'
+
+def find_log_files(state_log, message_log, debug_log):
+    """Log files given on the command line that exist, as (kind, path)."""
+    found = []
+    for kind, log in (('state', state_log), ('message', message_log), ('debug', debug_log)):
+        if log:
+            path = Path(log)
+            if path.exists():
+                found.append((kind, path))
+            else:
+                print(f"Warning: {kind.capitalize()} log not found: {log}")
+    return found
+
+def copy_log_files(state_log, message_log, debug_log, dest_dir):
+    """Link (or copy) log files into the visualizer directory."""
+    copied = find_log_files(state_log, message_log, debug_log)
+    dests = [dest_dir / f'{kind}_log.jsonl' for kind, _ in copied]
+    # Copies across filesystems run concurrently; file I/O releases the GIL
+    with ThreadPoolExecutor(max_workers=len(copied) or 1) as pool:
+        placed = pool.map(_link_or_copy, [path for _, path in copied], dests)
+        for (kind, path), dest, how in zip(copied, dests, placed):
+            print(f"{how} {kind} log: {path} -> {dest}")
     return copied
 
-def create_autoload_config(dest_dir, has_state, has_message, has_debug):
-    """Create a config file that tells the frontend to auto-load files."""
+def index_log(path):
+    """Scan a JSONL log for random access by tick.
+
+    Returns the number of records, the lowest and highest tick, the byte
+    offset at which each run of records for one tick starts as [tick,
+    offset] pairs, and the metadata record if the log starts with one.
+    Lines that are not JSON objects are skipped, and only integer ticks
+    count towards the tick range.
+    """
+    records = 0
+    offsets = []
+    metadata = None
+    prev_tick = None
+    offset = 0
+
+    with open(path, 'rb') as f:
+        for line in f:
+            obj = _json_loads(line) if line.strip() else None
+            if isinstance(obj, dict):
+                if offset == 0 and obj.get('metadata'):
+                    metadata = obj
+                else:
+                    records += 1
+                    tick = obj.get('tick')
+                    if tick != prev_tick:
+                        offsets.append([tick, offset])
+                        prev_tick = tick
+            offset += len(line)
+
+    ticks = [tick for tick, _ in offsets if type(tick) is int]
+    return {
+        'records': records,
+        'tickRange': [min(ticks), max(ticks)] if ticks else None,
+        'offsets': offsets,
+        'metadata': metadata
+    }
+
+def cached_log_index(path, cache, name):
+    """index_log(path), reusing the entry for `name` in `cache` while the
+    file's modification time and size are unchanged."""
+    stat = path.stat()
+    key = [stat.st_mtime_ns, stat.st_size]
+    entry = cache.get(name)
+    if not isinstance(entry, dict) or entry.get('key') != key:
+        entry = cache[name] = {'key': key, 'index': index_log(path)}
+    return entry['index']
+
+def create_autoload_config(dest_dir, has_state, has_message, has_debug, aliases=None,
+                           index=False):
+    """Create a config file that tells the frontend to auto-load files.
+
+    With `index`, each log also gets an index (see add_log_indexes).
+    """
     config = {
         'autoload': has_state and has_message,
         'stateFile': 'state_log.jsonl' if has_state else None,
         'messageFile': 'message_log.jsonl' if has_message else None,
         'debugFile': 'debug_log.jsonl' if has_debug else None
     }
+    if index:
+        add_log_indexes(config, dest_dir, aliases or {})
+
     config_path = dest_dir / 'autoload.json'
-    with open(config_path, 'w') as f:
-        json.dump(config, f)
+    with open(config_path, 'wb') as f:
+        f.write(_json_dumps(config))
     return config['autoload']
 
+def add_log_indexes(config, dest_dir, aliases):
+    """Add an index of each log in `config` (see index_log), so the frontend
+    can fetch the records of a given tick with a Range request.
+
+    Logs served from elsewhere are looked up in `aliases`, which maps URL
+    paths to files. Indexes are cached next to autoload.json.
+    """
+    cache_path = dest_dir / INDEX_CACHE_FILE
+    try:
+        with open(cache_path, 'rb') as f:
+            cache = _json_loads(f.read())
+    except (OSError, ValueError):
+        cache = {}
+    if not isinstance(cache, dict):
+        cache = {}  # Not a cache this script wrote
+
+    for file_key, index_key in (('stateFile', 'stateIndex'),
+                                ('messageFile', 'messageIndex'),
+                                ('debugFile', 'debugIndex')):
+        config[index_key] = None
+        if config[file_key]:
+            try:
+                name = config[file_key]
+                path = aliases.get('/' + name, dest_dir / name)
+                config[index_key] = cached_log_index(path, cache, name)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not index {config[file_key]}: {e}")
+
+    metadata = config['stateIndex'] and config['stateIndex']['metadata']
+    config['processCount'] = metadata.get('num_nodes') if metadata else None
+
+    try:
+        with open(cache_path, 'wb') as f:
+            f.write(_json_dumps(cache))
+    except OSError:
+        pass  # Only costs a rescan next time
+
+def parse_byte_range(header, size):
+    """Inclusive (first, last) byte offsets requested by a Range header.
+
+    Returns None when the header should be ignored: absent, malformed, or
+    asking for several ranges. Raises ValueError when the range lies
+    entirely past the end of a file of `size` bytes.
+    """
+    match = _BYTE_RANGE.fullmatch(header.strip()) if header else None
+    if match is None or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+
+    if not first:
+        # Suffix range: the last N bytes
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise ValueError("empty suffix range")
+        return max(size - suffix, 0), size - 1
+
+    first = int(first)
+    if last and int(last) < first:
+        return None
+    if first >= size:
+        raise ValueError("range starts past the end of the file")
+    return first, min(int(last), size - 1) if last else size - 1
+
+def negotiate_encoding(accept_encoding):
+    """Pick a content coding for a streamed log from an Accept-Encoding header.
+
+    Returns (coding, compressor), where the compressor has zlib's
+    compress/flush interface, or (None, None) to send the log as-is.
+    """
+    accepted = set()
+    for item in (accept_encoding or '').split(','):
+        coding, _, params = item.partition(';')
+        q = params.strip().partition('q=')[2]
+        try:
+            if q and float(q) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip().lower())
+
+    if 'zstd' in accepted and zstandard is not None:
+        return 'zstd', zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    if 'gzip' in accepted:
+        return 'gzip', zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return None, None
+
 class CORSHandler(http.server.SimpleHTTPRequestHandler):
-    """HTTP handler with CORS headers."""
+    """HTTP handler with CORS headers that streams JSONL logs."""
+
+    # Buffer the socket file objects so responses go out in large writes
+    rbufsize = 64 * 1024
+    wbufsize = 64 * 1024
+
+    # Keep connections open between requests; every response carries a
+    # Content-Length or is chunked
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEPALIVE_TIMEOUT
+
+    def __init__(self, *args, aliases=None, **kwargs):
+        # URL paths served from files outside the directory
+        self.aliases = aliases or {}
+        super().__init__(*args, **kwargs)
+
+    def translate_path(self, path):
+        url_path = path.split('?', 1)[0].split('#', 1)[0]
+        if url_path in self.aliases:
+            return str(self.aliases[url_path])
+        return super().translate_path(path)
+
+    # Cached copies must be revalidated, which unchanged logs answer with 304
+    _EXTRA_HEADERS = (b'Access-Control-Allow-Origin: *\r\n'
+                      b'Cache-Control: no-cache, must-revalidate\r\n')
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0].endswith('.jsonl'):
+            self.send_jsonl()
+        else:
+            super().do_GET()
+
+    def do_HEAD(self):
+        if self.path.split('?', 1)[0].endswith('.jsonl'):
+            self.send_jsonl(body=False)
+        else:
+            super().do_HEAD()
+
+    def send_jsonl(self, body=True):
+        """Send a JSONL log with chunked transfer encoding, whole lines per
+        chunk and compressed if the client accepts it, or the byte range
+        asked for in a Range header. Unchanged logs get 304 Not Modified;
+        HTTP/1.0 clients get the plain file with a Content-Length.
+
+        Without `body`, as for HEAD, only the headers are sent.
+        """
+        path = self.translate_path(self.path)
+        try:
+            f = open(path, 'rb', buffering=STREAM_CHUNK_SIZE)
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+
+        with f:
+            st = os.fstat(f.fileno())
+            size = st.st_size
+            if self.is_not_modified(st):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_validators(st)
+                self.end_headers()
+                return
+
+            try:
+                byte_range = parse_byte_range(self.headers.get('Range'), size)
+            except ValueError:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if byte_range is not None:
+                self.send_byte_range(f, path, *byte_range, st, body)
+                return
+
+            self.send_response(HTTPStatus.OK)
+            self.send_header('Content-Type', self.guess_type(path))
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_validators(st)
+            self.send_header('Vary', 'Accept-Encoding')
+            if self.request_version in ('HTTP/0.9', 'HTTP/1.0'):
+                # Chunked transfer coding is HTTP/1.1 only, so older clients
+                # get the file as is, with its length
+                self.send_header('Content-Length', str(size))
+                self.end_headers()
+                if body:
+                    self.copyfile(f, self.wfile)
+                return
+
+            coding, compressor = negotiate_encoding(self.headers.get('Accept-Encoding'))
+            if coding:
+                self.send_header('Content-Encoding', coding)
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            if not body:
+                return
+            while chunk := f.read(STREAM_CHUNK_SIZE) + f.readline():
+                if compressor:
+                    chunk = compressor.compress(chunk)
+                self.write_chunk(chunk)
+            if compressor:
+                self.write_chunk(compressor.flush())
+            self.wfile.write(b'0\r\n\r\n')
+
+    @staticmethod
+    def etag(st):
+        """Weak entity tag of a file, from its modification time and size."""
+        return f'W/"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+    def send_validators(self, st):
+        self.send_header('ETag', self.etag(st))
+        self.send_header('Last-Modified', self.date_time_string(st.st_mtime))
+
+    def is_not_modified(self, st):
+        """Does the client already hold this version of the file?
+
+        If-None-Match takes precedence over If-Modified-Since; entity tags
+        compare weakly.
+        """
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            if if_none_match.strip() == '*':
+                return True
+            etag = self.etag(st).removeprefix('W/')
+            return any(tag.strip().removeprefix('W/') == etag
+                       for tag in if_none_match.split(','))
+
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since is None:
+            return False
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since)
+        except (TypeError, IndexError, OverflowError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        modified = datetime.fromtimestamp(st.st_mtime, timezone.utc).replace(microsecond=0)
+        return modified <= since
+
+    def write_chunk(self, data):
+        # An empty chunk would end the response
+        if data:
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+
+    def send_byte_range(self, f, path, first, last, st, body=True):
+        """Send bytes first..last of the open file f as a 206 response,
+        or only its headers without `body`."""
+        length = last - first + 1
+        self.send_response(HTTPStatus.PARTIAL_CONTENT)
+        self.send_header('Content-Type', self.guess_type(path))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_validators(st)
+        self.send_header('Content-Range', f'bytes {first}-{last}/{st.st_size}')
+        self.send_header('Content-Length', str(length))
+        self.end_headers()
+        if not body:
+            return
+
+        self.wfile.flush()
+        self.sendfile(f, first, length)
+
+    def sendfile(self, f, offset, count):
+        """Send count bytes of file f from offset to the client; the kernel
+        copies them straight from the file to the socket."""
+        # socket.sendfile waits for the socket when the send buffer is full,
+        # which raw os.sendfile does not on a socket with a timeout
+        self.connection.sendfile(f, offset, count)
+
+    def copyfile(self, source, outputfile):
+        """Send the rest of a static file with os.sendfile where possible."""
+        try:
+            fd = source.fileno()
+        except (AttributeError, io.UnsupportedOperation):
+            fd = None  # In-memory bodies such as directory listings
+        if fd is None or not hasattr(os, 'sendfile'):
+            super().copyfile(source, outputfile)
+            return
+
+        offset = source.tell()
+        outputfile.flush()  # Headers first
+        self.sendfile(source, offset, os.fstat(fd).st_size - offset)
 
     def end_headers(self):
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Cache-Control', 'no-cache')
+        if self.request_version != 'HTTP/0.9':
+            # Queued with the buffered headers so they go out in one write
+            self._headers_buffer.append(self._EXTRA_HEADERS)
         super().end_headers()
 
-    def log_message(self, format, *args):
+    def log_request(self, code='-', size='-'):
         # Quieter logging - only show errors
-        if args[1].startswith('4') or args[1].startswith('5'):
-            super().log_message(format, *args)
+        try:
+            if int(code) >= 400:
+                super().log_request(code, size)
+        except (TypeError, ValueError):
+            pass
+
+    def log_error(self, format, *args):
+        pass  # Failed requests are logged by log_request
+
+class TunedHTTPServer(http.server.ThreadingHTTPServer):
+    """Threaded HTTP server with large socket buffers and Nagle's algorithm
+    disabled. At most MAX_CONNECTIONS connections are served at once;
+    further connections wait in the accept queue. `family` is the socket's
+    address family (see server_address)."""
+
+    allow_reuse_address = True
+    request_queue_size = 128
+    daemon_threads = True  # Ctrl+C does not wait for open connections
+
+    def __init__(self, server_address, RequestHandlerClass, family=socket.AF_INET, **kwargs):
+        self.address_family = family  # Read when the base class creates the socket
+        self._slots = threading.BoundedSemaphore(MAX_CONNECTIONS)
+        super().__init__(server_address, RequestHandlerClass, **kwargs)
+
+    def server_bind(self):
+        if self.address_family == socket.AF_INET6:
+            # Dual-stack: an IPv6 socket bound to :: also accepts IPv4
+            try:
+                self.socket.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 0)
+            except (AttributeError, OSError):
+                pass
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+        super().server_bind()
+
+    def process_request(self, request, client_address):
+        request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        request.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+        self._slots.acquire()
+        super().process_request(request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self._slots.release()
+
+def server_address(host, port):
+    """(family, sockaddr) to bind host:port with, IPv6 or IPv4 as host needs."""
+    infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM, flags=socket.AI_PASSIVE)
+    family, _, _, _, sockaddr = infos[0]
+    return family, sockaddr
+
+def server_url(host, port):
+    """URL at which the browser reaches a server bound to host."""
+    if host in ('', '0.0.0.0', '::'):
+        host = '127.0.0.1'
+    elif ':' in host:
+        host = f'[{host}]'
+    return f'http://{host}:{port}'
+
+def serve_aiohttp(directory, host, port, aliases=None):
+    """Serve the visualizer directory from an aiohttp application, and the
+    files in `aliases` at their URL paths."""
+    @web.middleware
+    async def cors_headers(request, handler):
+        response = await handler(request)
+        if request.path.endswith('.jsonl') and 'Range' not in request.headers:
+            response.enable_compression()  # gzip or deflate, as the client accepts
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        response.headers['Cache-Control'] = 'no-cache, must-revalidate'
+        return response
+
+    async def index(request):
+        return web.FileResponse(directory / 'index.html')
+
+    app = web.Application(middlewares=[cors_headers])
+    app.router.add_get('/', index)
+    for url_path, path in (aliases or {}).items():
+        async def alias(request, path=path):
+            return web.FileResponse(path)
+        app.router.add_get(url_path, alias)
+    app.router.add_static('/', str(directory), show_index=True)
+    # Stops on Ctrl+C by itself
+    # asyncio binds IPv6 sockets IPv6-only, so listen on both wildcards
+    hosts = ['0.0.0.0', '::'] if host == '::' else host
+    web.run_app(app, host=hosts, port=port, access_log=None, print=None)
 
 def main():
     args = parse_args()
@@ -124,7 +616,17 @@ def main():
     has_message = False
     has_debug = False
 
-    if args.state_log or args.message_log or args.debug_log:
+    aliases = {}
+
+    if args.in_place:
+        found = find_log_files(args.state_log, args.message_log, args.debug_log)
+        aliases = {f'/{kind}_log.jsonl': path.resolve() for kind, path in found}
+        has_state = '/state_log.jsonl' in aliases
+        has_message = '/message_log.jsonl' in aliases
+        has_debug = '/debug_log.jsonl' in aliases
+        for url_path, path in aliases.items():
+            print(f"Serving {path} at {url_path}")
+    elif args.state_log or args.message_log or args.debug_log:
         copied = copy_log_files(args.state_log, args.message_log, args.debug_log, script_dir)
         has_state = any(t == 'state' for t, _ in copied)
         has_message = any(t == 'message' for t, _ in copied)
@@ -136,12 +638,14 @@ def main():
         has_debug = (script_dir / 'debug_log.jsonl').exists()
 
     # Create autoload config
-    autoload = create_autoload_config(script_dir, has_state, has_message, has_debug)
+    autoload = create_autoload_config(script_dir, has_state, has_message, has_debug, aliases,
+                                      args.index)
 
     print()
     print(f"Starting Bully Election Visualizer")
     print(f"=" * 40)
-    print(f"Server: http://localhost:{args.port}")
+    url = server_url(args.bind, args.port)
+    print(f"Server: {url}")
     print(f"State log: {'Ready' if has_state else 'Not found'}")
     print(f"Message log: {'Ready' if has_message else 'Not found'}")
     print(f"Debug log: {'Ready' if has_debug else 'Not found'}")
@@ -152,10 +656,17 @@ def main():
 
     # Open browser
     if not args.no_browser:
-        webbrowser.open(f'http://localhost:{args.port}')
+        webbrowser.open(url)
 
     # Start server
-    with socketserver.TCPServer(("", args.port), CORSHandler) as httpd:
+    if web is not None:
+        serve_aiohttp(script_dir, args.bind, args.port, aliases)
+        print("\nServer stopped.")
+        return
+
+    family, address = server_address(args.bind, args.port)
+    handler = functools.partial(CORSHandler, aliases=aliases)
+    with TunedHTTPServer(address, handler, family) as httpd:
         try:
             httpd.serve_forever()
         except KeyboardInterrupt: